@@ -22,168 +22,234 @@ cases.
 
 from html import escape, unescape
 from html.parser import HTMLParser as _HTMLParser
-
-HTML5TAGS = {
-    "a",
-    "abbr",
-    # "acronym",
-    "address",
-    # "applet",
-    "area",
-    "article",
-    "aside",
-    "audio",
-    "b",
-    "base",
-    "basefont",
-    "bdi",
-    "bdo",
-    # "big",
-    "blockquote",
-    "body",
-    "br",
-    "button",
-    "canvas",
-    "caption",
-    # "center",
-    "cite",
-    "code",
-    "col",
-    "colgroup",
-    "data",
-    "datalist",
-    "dd",
-    "del",
-    "details",
-    "dfn",
-    "dialog",
-    # "dir",
-    "div",
-    "dl",
-    "dt",
-    "em",
-    "embed",
-    "fieldset",
-    "figcaption",
-    "figure",
-    # "font",
-    "footer",
-    "form",
-    # "frame",
-    # "framset",
-    "head",
-    "header",
-    "hgroup",
-    "h1",
-    "h2",
-    "h3",
-    "h4",
-    "h5",
-    "h6",
-    "hr",
-    "html",
-    "i",
-    "iframe",
-    "img",
-    "input",
-    "ins",
-    "kbd",
-    "keygen",
-    "label",
-    "legend",
-    "li",
-    "link",
-    "main",
-    "map",
-    "mark",
-    "menu",
-    "menuitem",
-    "meta",
-    "meter",
-    "nav",
-    # "noframes",
-    "noscript",
-    "object",
-    "ol",
-    "optgroup",
-    "option",
-    "output",
-    "p",
-    "param",
-    "picture",
-    "pre",
-    "progress",
-    "q",
-    "rp",
-    "rt",
-    "ruby",
-    "s",
-    "samp",
-    "script",
-    "section",
-    "select",
-    "small",
-    "source",
-    "span",
-    # "strike",
-    "strong",
-    "style",
-    "sub",
-    "summary",
-    "sup",
-    "svg",
-    "table",
-    "tbody",
-    "td",
-    "template",
-    "textarea",
-    "tfoot",
-    "th",
-    "thead",
-    "time",
-    "title",
-    "tr",
-    "track",
-    # "tt",
-    "u",
-    "ul",
-    "var",
-    "video",
-    "wbr",
-}
+import sys
+
+HTML5TAGS = frozenset(
+    {
+        "a",
+        "abbr",
+        # "acronym",
+        "address",
+        # "applet",
+        "area",
+        "article",
+        "aside",
+        "audio",
+        "b",
+        "base",
+        "basefont",
+        "bdi",
+        "bdo",
+        # "big",
+        "blockquote",
+        "body",
+        "br",
+        "button",
+        "canvas",
+        "caption",
+        # "center",
+        "cite",
+        "code",
+        "col",
+        "colgroup",
+        "data",
+        "datalist",
+        "dd",
+        "del",
+        "details",
+        "dfn",
+        "dialog",
+        # "dir",
+        "div",
+        "dl",
+        "dt",
+        "em",
+        "embed",
+        "fieldset",
+        "figcaption",
+        "figure",
+        # "font",
+        "footer",
+        "form",
+        # "frame",
+        # "framset",
+        "head",
+        "header",
+        "hgroup",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "hr",
+        "html",
+        "i",
+        "iframe",
+        "img",
+        "input",
+        "ins",
+        "kbd",
+        "keygen",
+        "label",
+        "legend",
+        "li",
+        "link",
+        "main",
+        "map",
+        "mark",
+        "menu",
+        "menuitem",
+        "meta",
+        "meter",
+        "nav",
+        # "noframes",
+        "noscript",
+        "object",
+        "ol",
+        "optgroup",
+        "option",
+        "output",
+        "p",
+        "param",
+        "picture",
+        "pre",
+        "progress",
+        "q",
+        "rp",
+        "rt",
+        "ruby",
+        "s",
+        "samp",
+        "script",
+        "section",
+        "select",
+        "small",
+        "source",
+        "span",
+        # "strike",
+        "strong",
+        "style",
+        "sub",
+        "summary",
+        "sup",
+        "svg",
+        "table",
+        "tbody",
+        "td",
+        "template",
+        "textarea",
+        "tfoot",
+        "th",
+        "thead",
+        "time",
+        "title",
+        "tr",
+        "track",
+        # "tt",
+        "u",
+        "ul",
+        "var",
+        "video",
+        "wbr",
+    }
+)
 
 # render with newline after closing tag
-NL_ELEMENTS = {
-    "body",
-    "br",
-    "div",
-    "hr",
-    "p",
-    "td",
-    "th",
-    "thead",
-    "tbody",
-    "tr",
-}
+NL_ELEMENTS = frozenset(
+    {
+        "body",
+        "br",
+        "div",
+        "hr",
+        "p",
+        "td",
+        "th",
+        "thead",
+        "tbody",
+        "tr",
+    }
+)
+
+# elements with text contents that are not escaped
+RAW_TEXT_ELEMENTS = frozenset({"script", "style"})
 
 # elements that do not take a closing tag
-VOID_ELEMENTS = {
-    "area",
-    "base",
-    "br",
-    "col",
-    "embed",
-    "hr",
-    "img",
-    "input",
-    "keygen",  # deprecated
-    "link",
-    "meta",
-    "param",  # deprecated
-    "source",
-    "track",
-    "wbr",
-}
+VOID_ELEMENTS = frozenset(
+    {
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "keygen",  # deprecated
+        "link",
+        "meta",
+        "param",  # deprecated
+        "source",
+        "track",
+        "wbr",
+    }
+)
+
+
+# longest text interned by `intern_short()`
+INTERN_SHORT_MAX_LEN = 32
+
+
+def intern(s):
+    """Intern string (only) to share a single object for repeated
+    values. Interned strings are freed when no longer referenced."""
+    if s.__class__ is str:
+        return sys.intern(s)
+    return s
+
+
+def intern_short(s):
+    """Intern string if short (e.g., labels, table cells): long text
+    is rarely repeated."""
+    if s.__class__ is str and len(s) <= INTERN_SHORT_MAX_LEN:
+        return sys.intern(s)
+    return s
+
+
+def escape_text(s):
+    """Escape text (&, <, >).
+
+    Text rarely contains characters to escape; substring tests are
+    much cheaper than `escape()` itself, which always runs one
+    `str.replace()` per character."""
+    if "&" in s or "<" in s or ">" in s:
+        return escape(s, quote=False)
+    return s
+
+
+def escape_quoted(s):
+    """Escape text including quotes (&, <, >, ", ')."""
+    if "&" in s or "<" in s or ">" in s or '"' in s or "'" in s:
+        return escape(s)
+    return s
+
+
+class FrozenException(Exception):
+    pass
+
+
+def check_frozen(o):
+    """Raise `FrozenException` if object is frozen."""
+    if o.frozen:
+        raise FrozenException(f"cannot update frozen object ({o!r})")
+
+
+def get_defaults_key(defaults):
+    """Return key identifying the current state of defaults (for
+    cached renderings). Empty defaults are equivalent to none."""
+    if defaults == None or defaults.is_empty():
+        return None
+    return (defaults, defaults.version)
 
 
 def is_void(tag):
@@ -191,29 +257,66 @@ def is_void(tag):
     return tag in VOID_ELEMENTS
 
 
+def make_tag_strings(tag):
+    """Return static strings and flag for rendering tag: (open, close,
+    void).
+
+    `open` is the unterminated opening tag and `close` is what follows
+    the children (closing tag, if any, and newline, if any). `void` is
+    `True` for a void element."""
+    nl = "\n" if tag in NL_ELEMENTS else ""
+    if tag in VOID_ELEMENTS:
+        return (f"<{tag}", f">{nl}", True)
+    return (f"<{tag}", f"</{tag}>{nl}", False)
+
+
+# precomputed static strings (and flag) for known tags
+TAG_STRINGS = {tag: make_tag_strings(tag) for tag in HTML5TAGS}
+
+
 class Attr:
     """Element attribute."""
 
+    __slots__ = ("frozen", "name", "rendered", "values")
+
     def __init__(self, name, values=None):
         """Initialize.
 
         Args:
             name (str): Attribute name.
             values (list): List of strings.
+
+        Values are kept in order of addition, without duplicates.
+        They must be updated with the methods (not directly) so that
+        the cached rendering is reset. Names are interned, values only
+        if short (e.g., not long `style` or `href` values).
         """
-        self.name = name
-        self.values = set()
+        self.frozen = False
+        self.name = intern(name)
+        self.rendered = None
+        self.values = []
         if values:
             self.update(values)
 
     def add(self, v):
         """Add a value."""
-        if v != None:
-            self.values.add(v)
+        check_frozen(self)
+        if v != None and v not in self.values:
+            self.values.append(intern_short(v))
+            self.rendered = None
 
     def clear(self):
         """Clear current values."""
+        check_frozen(self)
         self.values.clear()
+        self.rendered = None
+
+    def freeze(self):
+        """Freeze (disallow updates).
+
+        Values are stored as a tuple."""
+        self.frozen = True
+        self.values = tuple(self.values)
 
     def get(self):
         """Get values."""
@@ -224,20 +327,29 @@ class Attr:
 
         Args:
             extra (Attr): Extra attr with values to apply.
+
+        Without extra values, the rendered string is cached.
         """
-        values = self.values.copy()
-        if extra:
-            values.update(extra.values)
-        values = list(filter(None, values))
+        if not extra or not extra.values:
+            if self.rendered == None:
+                self.rendered = self._render(self.values)
+            return self.rendered
+        values = [*self.values, *[v for v in extra.values if v not in self.values]]
+        return self._render(values)
+
+    def _render(self, values):
+        if None in values or "" in values:
+            values = list(filter(None, values))
         if values:
-            return '%s="%s"' % (self.name, " ".join([escape(v) for v in values]))
+            return f'{self.name}="{" ".join([escape_quoted(v) for v in values])}"'
         else:
             return self.name
 
     def set(self, values):
         """Set attribute values."""
+        check_frozen(self)
         self.values.clear()
-        self.values.update(values)
+        self.update(values)
 
     def tree(self, writer, parent):
         d = {
@@ -250,7 +362,12 @@ class Attr:
 
     def update(self, values):
         """Update with values."""
-        self.values.update(filter(None, values))
+        check_frozen(self)
+        _values = self.values
+        for v in values:
+            if v and v not in _values:
+                _values.append(intern_short(v))
+        self.rendered = None
 
 
 class Defaults:
@@ -258,22 +375,30 @@ class Defaults:
 
     This makes it easy to apply defaults across many elements without
     repeatedly cluttering up the individual elements, themselves.
+
+    `version` is incremented by each update (via the methods) so that
+    renderings cached by frozen elements are invalidated.
     """
 
     def __init__(self, name=None):
         self.name = name
         self.tag2attrs = {}
+        self.version = 0
 
     def append_attrs(self, tag, **kwargs):
         """Append atttributes for tag."""
+        self.version += 1
         attrs = self.tag2attrs.setdefault(tag, {})
         for k, values in kwargs.items():
             k = k.lstrip("_")
-            attr = attrs.setdefault(k, Attr(k))
+            attr = attrs.get(k)
+            if attr == None:
+                attr = attrs[k] = Attr(k)
             attr.update(values)
 
     def clear_attrs(self, tag):
         """Clear attributes for tag."""
+        self.version += 1
         try:
             del self.tag2attrs[tag]
         except:
@@ -283,6 +408,10 @@ class Defaults:
         """Get attributes for tag."""
         return self.tag2attrs.setdefault(tag, {})
 
+    def is_empty(self):
+        """Return if there are no attributes (for any tag) or not."""
+        return not any(self.tag2attrs.values())
+
     def keys(self):
         """Get tags."""
         return self.tag2attrs.keys()
@@ -319,6 +448,7 @@ class Defaults:
             tag (str): Tag.
             kwargs: Key-value settings for attributes.
         """
+        self.version += 1
         attrs = self.tag2attrs.setdefault(tag, {})
         for k, values in kwargs.items():
             k = k.lstrip("_")
@@ -333,7 +463,15 @@ class Defaults:
 
 
 class Node:
-    """Base node, no children."""
+    """Base node, no children.
+
+    Nodes use `__slots__`: documents can have many thousands of nodes."""
+
+    __slots__ = ("frozen",)
+
+    def __init__(self):
+        # see `freeze()`
+        self.frozen = False
 
     def _match(self, o):
         """Return self if a match with object.
@@ -356,13 +494,31 @@ class Node:
         Returns:
             Self/this object.
         """
-        if type(o) == self.__class__:
+        if o.__class__ is self.__class__:
             return self._match(o)
 
+    def freeze(self):
+        """Freeze node (and subtree, if any): disallow updates.
+
+        A frozen element caches its rendered output, so it is only
+        rendered once (per applicable defaults).
+
+        Children (and attribute values) are stored as tuples. Note:
+        Other direct updates of members (e.g., `attrs`) are not
+        detected and must not be done.
+
+        Returns:
+            Self.
+        """
+        self.frozen = True
+        return self
+
 
 class ParentNode(Node):
     """Node with children."""
 
+    __slots__ = ("children",)
+
     def add(self, *children) -> "Element":
         """Add child elements.
 
@@ -374,10 +530,10 @@ class ParentNode(Node):
             Self.
         """
         # TODO: validate object type of children
-        for child in children:
-            if isinstance(child, str):
-                child = Text(child)
-            self.children.append(child)
+        check_frozen(self)
+        self.children.extend(
+            [Text(child) if isinstance(child, str) else child for child in children]
+        )
         return self
 
     def find(self, o):
@@ -389,6 +545,23 @@ class ParentNode(Node):
         for oo in self.find(o):
             return oo
 
+    def find1_tag(self, tag):
+        """Return first element with tag (or `None`).
+
+        Like `find1(Element(tag))` without the `Element` and the match
+        calls."""
+        for oo in self.walk():
+            if oo.__class__ is Element and oo.tag == tag:
+                return oo
+
+    def freeze(self):
+        super().freeze()
+        # tuple: smaller, and direct updates fail
+        self.children = tuple(self.children)
+        for child in self.children:
+            child.freeze()
+        return self
+
     def insert(self, idx, *children) -> "Element":
         """Insert child elements at position `idx`.
 
@@ -398,29 +571,48 @@ class ParentNode(Node):
         Returns:
             Self.
         """
-        # TODO: improve efficiency
-        for child in reversed(children):
-            if isinstance(child, str):
-                child = Text(child)
-            self.children.insert(idx, child)
+        check_frozen(self)
+        self.children[idx:idx] = [
+            Text(child) if isinstance(child, str) else child for child in children
+        ]
         return self
 
     def walk(self):
-        """Walk the tree and return each object."""
-        for child in self.children:
-            yield child
-            if type(child) == Element:
-                yield from child.walk()
+        """Walk the tree and return each object.
+
+        Objects are returned depth first, in document order. Uses an
+        explicit stack of (live) children iterators rather than nested
+        generators."""
+        stack = [iter(self.children)]
+        while stack:
+            for child in stack[-1]:
+                yield child
+                if child.__class__ is Element:
+                    stack.append(iter(child.children))
+                    break
+            else:
+                stack.pop()
 
     def walk_callback(self, callback):
         """Walk tree and call callback for each object."""
         for child in self.walk():
             callback(child)
 
+    def walk_by_tags(self, tags, callback):
+        """Walk tree and call callback for each element with a tag in
+        tags (only).
+
+        Other objects are skipped without calling back."""
+        for child in self.walk():
+            if child.__class__ is Element and child.tag in tags:
+                callback(child)
+
 
 class Comment(Node):
     """HTML comment."""
 
+    __slots__ = ("s",)
+
     def __init__(self, s):
         super().__init__()
         self.s = s
@@ -429,10 +621,14 @@ class Comment(Node):
         if o.s == self.s:
             return self
 
-    def render(self, writer, parent):
-        return f"<!-- {escape(self.s)} -->"
+    def render(self, writer, parent, out=None):
+        s = f"<!-- {escape_quoted(self.s)} -->"
+        if out == None:
+            return s
+        out.append(s)
 
     def set(self, s):
+        check_frozen(self)
         self.s = s
 
     def tree(self, writer, parent):
@@ -447,6 +643,8 @@ class Comment(Node):
 class Element(ParentNode):
     """HTML element."""
 
+    __slots__ = ("attrs", "defaults", "rendered", "tag")
+
     def __init__(self, tag, *children, **kwargs):
         """Initialize.
 
@@ -464,11 +662,14 @@ class Element(ParentNode):
         self.attrs = {}
         self.children = []
         self.defaults = None
+        self.rendered = None
 
-        self.tag = tag
-        self.add(*children)
-        self.defaults = kwargs.pop("default", None)
-        self.add_attrs(**kwargs)
+        self.tag = sys.intern(tag)
+        if children:
+            self.add(*children)
+        if kwargs:
+            self.defaults = kwargs.pop("default", None)
+            self.add_attrs(**kwargs)
 
     def __repr__(self):
         return f"""<Element tag="{self.tag}" nattrs="{len(self.attrs)}" at {hex(id(self))})>"""
@@ -479,10 +680,11 @@ class Element(ParentNode):
             return self
 
     def add_attr(self, name, value):
+        check_frozen(self)
         attr = self.attrs.get(name)
-        if not attr:
+        if attr == None:
             attr = self.attrs[name] = Attr(name)
-        if type(value) not in [list, tuple]:
+        if value.__class__ not in (list, tuple):
             value = [value]
         attr.update(value)
 
@@ -496,13 +698,16 @@ class Element(ParentNode):
             &lt;name> (str, list): List of string values associated with the
                 attribute.
         """
+        check_frozen(self)
+
+        attrs = self.attrs
 
         def _add(k, v):
-            attr = self.attrs.get(k)
-            if not attr:
-                attr = self.attrs[k] = Attr(k)
-            if v not in [None, True]:
-                if type(v) == str:
+            attr = attrs.get(k)
+            if attr == None:
+                attr = attrs[k] = Attr(k)
+            if v not in (None, True):
+                if v.__class__ is str:
                     v = [v]
                 attr.update(v)
 
@@ -515,6 +720,12 @@ class Element(ParentNode):
 
         return self
 
+    def freeze(self):
+        super().freeze()
+        for attr in self.attrs.values():
+            attr.freeze()
+        return self
+
     def get_attrs(self):
         return self.attrs
 
@@ -522,55 +733,86 @@ class Element(ParentNode):
         """Return True if this is a void element."""
         return is_void(self.tag)
 
-    def render(self, writer, parent):
+    def render(self, writer, parent, out=None):
         """Render element (and children) with attributes.
 
         Args:
             writer (HTMLWriter)
             parent (Element|None): Parent element. `None` if topmost
                 element (typically `&lt;html>`).
+            out (list|None): Output list to which rendered strings are
+                appended.
+
+        Returns:
+            Rendered string if `out` is not given.
 
         The opening and closing tags enclose zero or more child
         elements. `render()` is called on each child. As a
         convenience, `str` children are converted to `Text`.
+
+        A frozen element is rendered once and the result is reused
+        for as long as the applicable defaults (its own and the
+        writer's, which apply to its children) are unchanged:
+
+        >>> writer = HTMLWriter()
+        >>> p = HTML5ElementFactory().p("text").freeze()
+        >>> p.render(writer, None).rstrip()
+        '<p>text</p>'
+        >>> writer.defaults.append_attrs("p", _class=["lead"])
+        >>> p.render(writer, None).rstrip()
+        '<p class="lead">text</p>'
         """
-        # print(f"render {self.tag=} {self.children=} {self.attrs=}")
+        if out == None:
+            out = []
+            self.render(writer, parent, out)
+            return "".join(out)
+
         defaults = self.defaults or writer.defaults
+
+        if self.frozen:
+            key = (get_defaults_key(self.defaults), get_defaults_key(writer.defaults))
+            rendered = self.rendered
+            if rendered == None or rendered[0] != key:
+                _out = []
+                self._render(writer, defaults, _out)
+                rendered = self.rendered = (key, "".join(_out))
+            out.append(rendered[1])
+        else:
+            self._render(writer, defaults, out)
+
+    def _render(self, writer, defaults, out):
+        # print(f"render {self.tag=} {self.children=} {self.attrs=}")
         if defaults:
             defattrs = defaults.get_attrs(self.tag)
         else:
             defattrs = {}
 
-        nl = self.tag in NL_ELEMENTS and "\n" or ""
+        tagopen, tagclose, void = TAG_STRINGS.get(self.tag) or make_tag_strings(self.tag)
 
+        # element attributes (in order), then those only in defaults
+        attrs = self.attrs
         attrsl = []
-        attrnames = set(self.attrs.keys()).union(defattrs.keys())
-        for attrname in attrnames:
-            attr = self.attrs.get(attrname)
-            extra = defattrs.get(attrname)
-            if attr == None:
-                attr = extra
-                extra = None
-            if attr:
-                attrsl.append(attr.render(extra))
+        if not defattrs:
+            for attr in attrs.values():
+                attrsl.append(attr.render())
+        else:
+            for name, attr in attrs.items():
+                attrsl.append(attr.render(defattrs.get(name)))
+            for name, extra in defattrs.items():
+                if name not in attrs:
+                    attrsl.append(extra.render())
 
-        if self.is_void():
+        if void:
             # no closing tag, not children
-            return "<%s %s>%s" % (self.tag, " ".join(attrsl), nl)
-        else:
-            childrenl = []
-            for child in self.children:
-                childrenl.append(child.render(writer, self))
-            return "<%s%s%s>%s</%s>%s" % (
-                self.tag,
-                " " if attrsl else "",
-                " ".join(attrsl),
-                "".join(childrenl),
-                self.tag,
-                nl,
-            )
+            out.append(f"{tagopen} {' '.join(attrsl)}{tagclose}")
+            return
+        out.append(f"{tagopen} {' '.join(attrsl)}>" if attrsl else f"{tagopen}>")
+        for child in self.children:
+            child.render(writer, self, out)
+        out.append(tagclose)
 
     def set_attrs(self, name, values):
+        check_frozen(self)
         self.attrs[name] = Attr(name, values)
 
     def tree(self, writer, parent):
@@ -601,6 +843,8 @@ class Element(ParentNode):
 class Raw(Node):
     """Raw markup."""
 
+    __slots__ = ("s",)
+
     def __init__(self, s):
         super().__init__()
         self.s = s
@@ -609,10 +853,13 @@ class Raw(Node):
         if o.s == self.s:
             return self
 
-    def render(self, writer, parent):
-        return self.s
+    def render(self, writer, parent, out=None):
+        if out == None:
+            return self.s
+        out.append(self.s)
 
     def set(self, s):
+        check_frozen(self)
         self.s = s
 
     def tree(self, writer, parent):
@@ -625,6 +872,8 @@ class Raw(Node):
 
 
 class Root(ParentNode):
+    __slots__ = ()
+
     def __init__(self, *children):
         """Root."""
         super().__init__()
@@ -632,11 +881,35 @@ class Root(ParentNode):
 
         self.add(*children)
 
-    def render(self, writer, parent):
-        childrenl = []
+    def _get_section(self, tag):
+        # usually a child of the top-level html element
+        for child in self.children:
+            if child.__class__ is Element and child.tag == "html":
+                for child in child.children:
+                    if child.__class__ is Element and child.tag == tag:
+                        return child
+                break
+        return self.find1_tag(tag)
+
+    def get_body(self):
+        """Return body element (or `None`).
+
+        Checks the children of the html element before searching the
+        whole tree."""
+        return self._get_section("body")
+
+    def get_head(self):
+        """Return head element (or `None`). See `get_body()`."""
+        return self._get_section("head")
+
+    def render(self, writer, parent, out=None):
+        if out == None:
+            out = []
+            self.render(writer, parent, out)
+            return "".join(out)
+
         for child in self.children:
-            childrenl.append(child.render(writer, self))
-        return "".join(childrenl)
+            child.render(writer, self, out)
 
     def tree(self, writer, parent):
         d = {
@@ -650,29 +923,40 @@ class Root(ParentNode):
 class Text(Node):
     """Text."""
 
+    __slots__ = ("raw", "s")
+
     def __init__(self, s):
         super().__init__()
-        self.s = s
+        # tag of raw text element for which contents were validated
+        self.raw = None
+        self.s = intern_short(s)
 
     def _match(self, o):
         if o.s == self.s:
             return self
 
-    def render(self, writer, parent):
+    def render(self, writer, parent, out=None):
         """Render safely.
 
-        Note: Special case for parent of <script>.
+        Note: Special case for parent of <script> and <style>: contents
+        are not escaped, but are validated (once).
         """
-        if isinstance(parent, Element) and parent.tag == "script":
+        if isinstance(parent, Element) and parent.tag in RAW_TEXT_ELEMENTS:
             s = self.s
-            if "<script" in s:
-                raise Exception("bad <script> contents")
+            if self.raw != parent.tag:
+                if f"<{parent.tag}" in s or f"</{parent.tag}" in s:
+                    raise Exception(f"bad <{parent.tag}> contents")
+                self.raw = parent.tag
         else:
-            s = escape(self.s, quote=False)
-        return s
+            s = escape_text(self.s)
+        if out == None:
+            return s
+        out.append(s)
 
     def set(self, s):
-        self.s = s
+        check_frozen(self)
+        self.raw = None
+        self.s = intern_short(s)
 
     def tree(self, writer, parent):
         d = {
@@ -700,27 +984,38 @@ class HTMLWriter:
         self.root = Root()
 
     def render(self):
-        """Render the document."""
-        return self.root.render(self, None)
+        """Render the document.
+
+        All nodes append to a single output list, joined once."""
+        out = []
+        self.root.render(self, None, out)
+        return "".join(out)
 
     def tree(self, writer, parent):
         return self.root.tree()
 
 
 class ElementFactory:
-    """Return an `Element` for the named tag."""
+    """Return an `Element` for the named tag.
+
+    The per-tag function is cached on the instance, so only the first
+    access goes through `__getattr__`."""
 
     def __init__(self, tags=None):
         self.tags = tags
 
     def __getattr__(self, name):
-        def _Element(*args, **kwargs):
-            return Element(name, *args, **kwargs)
+        return self._get_factory(name, name)
 
-        if self.tags == None or name in self.tags:
-            return _Element
+    def _get_factory(self, name, tag):
+        if self.tags != None and tag not in self.tags:
+            raise Exception(f"invalid tag ({name})")
+
+        def _Element(*args, **kwargs):
+            return Element(tag, *args, **kwargs)
 
-        raise Exception(f"invalid tag ({name})")
+        setattr(self, name, _Element)
+        return _Element
 
 
 class HTML5ElementFactory(ElementFactory):
@@ -729,7 +1024,7 @@ class HTML5ElementFactory(ElementFactory):
         super().__init__(tags)
 
     def __getattr__(self, name):
-        return super().__getattr__(name.lower())
+        return self._get_factory(name, name.lower())
 
 
 class MatchException(Exception):
@@ -737,21 +1032,43 @@ class MatchException(Exception):
 
 
 class Matcher:
+    """Match objects in a tree with a function."""
+
     def __init__(self, fn):
+        """Initialize.
+
+        Args:
+            fn (callable): Called with each object; returns true for
+                a match.
+        """
         self._matchfn = fn
 
+    @classmethod
+    def by_tag(cls, tag):
+        """Return matcher for elements by tag."""
+        return cls(lambda o: o.__class__ is Element and o.tag == tag)
+
     def match1(self, o):
         for oo in self.match(o):
             return oo
 
     def match(self, o):
+        """Match object and its descendants (depth first).
+
+        Yields:
+            Matching objects.
+        """
+        fn = self._matchfn
         try:
-            if self._matchfn(o):
+            if fn(o):
                 yield o
-            for child in getattr(o, "children", []):
-                if self._matchfn(child):
-                    yield o
-        except:
+            if isinstance(o, ParentNode):
+                for child in o.walk():
+                    if fn(child):
+                        yield child
+        except MatchException:
+            raise
+        except Exception:
             raise MatchException("bad match function")
 
 
@@ -769,11 +1086,14 @@ class HTMLParser(_HTMLParser):
 
     def handle_data(self, data):
         # print(f"data ({data=})")
-        self.last.add(unescape(data))
+        # with convert_charrefs (default), data is already unescaped
+        if not self.convert_charrefs:
+            data = unescape(data)
+        self.last.children.append(Text(data))
 
     def handle_endtag(self, tag):
         # print(f"end tag ({tag=}) ({self.last=})")
-        if type(self.last) == Root or tag != self.last.tag:
+        if self.last.__class__ is Root or tag != self.last.tag:
             print(
                 f"warning: ignoring end tag ({tag}) void tag? ({is_void(tag)}) at ({self.getpos()}) stack ({self.stack})"
             )
@@ -789,13 +1109,16 @@ class HTMLParser(_HTMLParser):
     def handle_starttag(self, tag, attrs):
         el = Element(tag)
         # print(f"start tag ({tag=}) ({el=})")
-        for attr in attrs:
-            k, v = attr
-            if k == "class":
-                v = v.split()
-            el.add_attrs((k, unescape(v) if v != None else None))
-        self.last.add(el)
-        if not is_void(tag):
+        # attribute values are already unescaped
+        elattrs = el.attrs
+        for k, v in attrs:
+            attr = elattrs.get(k)
+            if attr == None:
+                attr = elattrs[k] = Attr(k)
+            if v != None:
+                attr.update(v.split() if k == "class" else [v])
+        self.last.children.append(el)
+        if tag not in VOID_ELEMENTS:
             self.stack.append(el)
             self.last = el
 
@@ -803,7 +1126,7 @@ class HTMLParser(_HTMLParser):
         return len(self.stack) == 1
 
     def render(self):
-        return self.hw.root.render(self.hw, None)
+        return self.hw.render()
 
     def get_root(self):
         return self.hw.root
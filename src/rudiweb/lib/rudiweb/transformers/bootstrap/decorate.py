@@ -11,90 +11,138 @@
 
 import logging
 
-from lib.htmlwriter import Element, HTML5ElementFactory, Text
+from lib.htmlwriter import HTML5ElementFactory
 
 
 BRAND_LOGO_HREF = "/asis/img/brand-logo.png"
-BRAND_NAME_TEXT = Text("brand name")
-COPYRIGHT_STRING_TEXT = Text("Ⓒ 2023 company name")
+BRAND_NAME = "brand name"
+COPYRIGHT_STRING = "Ⓒ 2023 company name"
 
 logger = logging.getLogger(__name__)
 
 ef = HTML5ElementFactory()
 
-# static parts of the tree
-HEAD = [
-    ef.meta(_charset="utf-8"),
-    ef.meta(_name='"viewport" content="width=device-width, initial-scale=1"'),
-    ef.link(_href="/asis/bootstrap/css/bootstrap.min.css", _rel="stylesheet"),
-    ef.link(_href="/asis/extra.css", _rel="stylesheet"),
-    ef.link(_href="/asis/codehilite.css", _rel="stylesheet"),
-]
-
-NAVBAR = [
-    ef.nav(
-        _class=[
-            "navbar",
-            "sticky-top",
-            "navbar-dark",
-            "bg-dark",
-            "navbar-expand-md",
-            "py-1",
-            "border-bottom",
-            "border-success",
-            "border-2",
-        ],
-    ).add(
-        ef.div(_class="container").add(
-            ef.a(_href="/", _class="navbar-brand",).add(
-                BRAND_LOGO_IMG_ELEMENT := ef.img(
-                    # TODO: bg-light!?!
-                    _class=["img-fluid", "w-30"],
-                    # _style="border-radius: 4px; max-width: 30px; max-height: 30px; margin: 4px;",
-                    _style="border-radius: 4px; max-width: 30px; max-height: 30px; margin: 4px 4px 4px 0px;",
-                    _src=BRAND_LOGO_HREF,
-                    _alt="brand logo",
+# parts by settings (see `get_parts()`)
+PARTS_CACHE = {}
+
+
+def make_parts(
+    brand_logo_href, brand_logo_image_classes, brand_name, copyright_string, navbar_items
+):
+    """Make (frozen) parts of the tree for the settings.
+
+    Returns:
+        Tuple of lists of elements for: head, navbar, footer, bottom.
+    """
+    head = [
+        ef.meta(_charset="utf-8"),
+        ef.meta(_name='"viewport" content="width=device-width, initial-scale=1"'),
+        ef.link(_href="/asis/bootstrap/css/bootstrap.min.css", _rel="stylesheet"),
+        ef.link(_href="/asis/extra.css", _rel="stylesheet"),
+        ef.link(_href="/asis/codehilite.css", _rel="stylesheet"),
+    ]
+
+    navbar = [
+        ef.nav(
+            _class=[
+                "navbar",
+                "sticky-top",
+                "navbar-dark",
+                "bg-dark",
+                "navbar-expand-md",
+                "py-1",
+                "border-bottom",
+                "border-success",
+                "border-2",
+            ],
+        ).add(
+            ef.div(_class="container").add(
+                ef.a(_href="/", _class="navbar-brand",).add(
+                    brand_logo_img_element := ef.img(
+                        # TODO: bg-light!?!
+                        _class=["img-fluid", "w-30"],
+                        # _style="border-radius: 4px; max-width: 30px; max-height: 30px; margin: 4px;",
+                        _style="border-radius: 4px; max-width: 30px; max-height: 30px; margin: 4px 4px 4px 0px;",
+                        _src=brand_logo_href,
+                        _alt="brand logo",
+                    ),
+                    " ",
+                    brand_name,
+                ),
+                ef.button(
+                    _class="navbar-toggler",
+                    _type="button",
+                )
+                .add_attrs(
+                    ("data-bs-toggle", "collapse"),
+                    ("data-bs-target", "#navmenu"),
+                )
+                .add(
+                    ef.span(_class="navbar-toggler-icon"),
+                ),
+                ef.div(
+                    _class=["collapse", "navbar-collapse", "justify-content-md-center"],
+                    _id="navmenu",
+                ).add(
+                    navbar_ul_element := ef.ul(_class=["navbar-nav", "ms-auto"]),
                 ),
-                " ",
-                BRAND_NAME_TEXT,
             ),
-            ef.button(
-                _class="navbar-toggler",
-                _type="button",
-            )
-            .add_attrs(
-                ("data-bs-toggle", "collapse"),
-                ("data-bs-target", "#navmenu"),
+        )
+    ]
+
+    if brand_logo_image_classes:
+        brand_logo_img_element.add_attrs(_class=brand_logo_image_classes)
+
+    for d in navbar_items or []:
+        text = d.get("text")
+        link = d.get("link", "")
+        if text:
+            navbar_ul_element.add(
+                ef.li(_class="nav-item").add(
+                    ef.a(
+                        text,
+                        _href=link,
+                        _class="nav-link",
+                    ),
+                ),
             )
-            .add(
-                ef.span(_class="navbar-toggler-icon"),
-            ),
-            ef.div(
-                _class=["collapse", "navbar-collapse", "justify-content-md-center"],
-                _id="navmenu",
-            ).add(
-                NAVBAR_UL_ELEMENT := ef.ul(_class=["navbar-nav", "ms-auto"]),
+
+    footer = [
+        ef.section(_class="container").add(
+            ef.div(_align="center").add(
+                ef.hr(),
+                copyright_string,
+                " | ",
+                "Powered by ",
+                ef.a("rudiweb", _href="https://j4m-solutions.com/"),
+                ".",
             ),
         ),
-    )
-]
-
-FOOTER = [
-    ef.section(_class="container").add(
-        ef.div(_align="center").add(
-            ef.hr(),
-            COPYRIGHT_STRING_TEXT,
-            " | ",
-            "Powered by ",
-            ef.a("rudiweb", _href="https://j4m-solutions.com/"),
-            ".",
-        ),
-    ),
-]
+    ]
+
+    bottom = [
+        ef.script(_src="/asis/bootstrap/js/bootstrap.bundle.min.js"),
+    ]
 
-BOTTOM = [
-    ef.script(_src="/asis/bootstrap/js/bootstrap.bundle.min.js"),
-]
+    parts = (head, navbar, footer, bottom)
+    for part in parts:
+        for el in part:
+            el.freeze()
+    return parts
+
+
+def get_parts(*settings):
+    """Get parts of the tree for the settings (see `make_parts()`).
+
+    Parts are made once per settings and are frozen, so rendering is
+    done once, too. They are shared (across requests and threads) and
+    must not be updated."""
+    # settings come from the (yaml) configuration: repr is stable
+    key = repr(settings)
+    parts = PARTS_CACHE.get(key)
+    if parts == None:
+        parts = PARTS_CACHE[key] = make_parts(*settings)
+    return parts
 
 
 def main(rudic, content, root, *args, **kwargs):
@@ -114,9 +162,9 @@ def main(rudic, content, root, *args, **kwargs):
             from left to right, right justified on the navbar.
     """
     try:
-        html = root.find1(Element("html"))
-        head = html.find1(Element("head"))
-        body = html.find1(Element("body"))
+        html = root.find1_tag("html")
+        head = html.find1_tag("head")
+        body = html.find1_tag("body")
 
         # update from kwargs
         bootstrap_theme = kwargs.get("bootstrap_theme")
@@ -128,34 +176,17 @@ def main(rudic, content, root, *args, **kwargs):
 
         if bootstrap_theme:
             html.set_attrs("data-bs-theme", {bootstrap_theme})
-        if brand_logo_image_classes:
-            BRAND_LOGO_IMG_ELEMENT.add_attrs(_class=brand_logo_image_classes)
-        if brand_logo_href:
-            BRAND_LOGO_IMG_ELEMENT.set_attrs("src", {brand_logo_href})
-        if brand_name:
-            BRAND_NAME_TEXT.set(brand_name)
-        if copyright_string:
-            COPYRIGHT_STRING_TEXT.set(copyright_string)
-        if navbar_items:
-            # reset children (to avoid duplication)
-            NAVBAR_UL_ELEMENT.children = []
-
-            for d in navbar_items:
-                text = d.get("text")
-                link = d.get("link", "")
-                if text:
-                    NAVBAR_UL_ELEMENT.add(
-                        ef.li(_class="nav-item").add(
-                            ef.a(
-                                text,
-                                _href=link,
-                                _class="nav-link",
-                            ),
-                        ),
-                    )
+
+        head_parts, navbar_parts, footer_parts, bottom_parts = get_parts(
+            brand_logo_href or BRAND_LOGO_HREF,
+            brand_logo_image_classes,
+            brand_name or BRAND_NAME,
+            copyright_string or COPYRIGHT_STRING,
+            navbar_items,
+        )
 
         # TODO: prepend?
-        head.add(*HEAD)
+        head.add(*head_parts)
         try:
             parent, base = rudic.rudif.nameroot.rsplit("/", 1)
             head.add(ef.title(f"{base} ({parent})"))
@@ -165,13 +196,13 @@ def main(rudic, content, root, *args, **kwargs):
         # navbar (slip in before the content)
         children = body.children
         body.children = []
-        body.add(*NAVBAR)
+        body.add(*navbar_parts)
         # body.add(ef.section(div := ef.div(_class="container")))
         # div.children.extend(children)
         body.add(*children)
 
-        body.add(*FOOTER)
-        body.add(*BOTTOM)
+        body.add(*footer_parts)
+        body.add(*bottom_parts)
 
         return root
     except Exception as e:
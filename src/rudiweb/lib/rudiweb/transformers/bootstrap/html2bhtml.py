@@ -12,7 +12,7 @@ Simply wrap HTML as appropriate for bootstrap:
     </section>
 """
 
-from lib.htmlwriter import Element, HTML5ElementFactory
+from lib.htmlwriter import HTML5ElementFactory
 
 ef = HTML5ElementFactory()
 
@@ -22,7 +22,7 @@ def main(rudic, content, root, *args, **kwargs):
         passthroughs = kwargs.get("passthroughs", [".bhtml"])
 
         if rudic.rudif.get_extension() not in passthroughs:
-            body = root.find1(Element("body"))
+            body = root.get_body()
             children = body.children
             body.children = []
             body.add(ef.section(ef.div(_class="container").add(*children)))
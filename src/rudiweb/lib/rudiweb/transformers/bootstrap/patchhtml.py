@@ -8,69 +8,70 @@ settings.
 
 import re
 
-from lib.htmlwriter import Element, HTML5ElementFactory
+from lib.htmlwriter import HTML5ElementFactory
 
+# in order of likelihood (first match applies)
 ADMONITION2ATTRS = {
-    "danger": ["alert", "alert-danger"],
-    "dark": ["alert", "alert-dark"],
     "info": ["alert", "alert-info"],
-    "light": ["alert", "alert-light"],
     "note": ["alert", "alert-note"],
-    "primary": ["alert", "alert-primary"],
+    "warning": ["alert", "alert-warning"],
+    "tip": ["alert", "alert-tip"],
+    "danger": ["alert", "alert-danger"],
     "success": ["alert", "alert-success"],
+    "primary": ["alert", "alert-primary"],
     "secondary": ["alert", "alert-secondary"],
-    "tip": ["alert", "alert-tip"],
-    "warning": ["alert", "alert-warning"],
+    "dark": ["alert", "alert-dark"],
+    "light": ["alert", "alert-light"],
 }
 
 ef = HTML5ElementFactory()
 
 
+TABLE_CLASSES = ["table", "table-striped", "table-hover"]
+
+
+def patch_div(o):
+    attr = o.attrs.get("class")
+    if attr == None:
+        return
+
+    # from markdown; only updated if not already patched (e.g., frozen
+    # addhtmltag fragment)
+    if "admonition" in attr.values:
+        values = set(attr.values)
+        for name, avalues in ADMONITION2ATTRS.items():
+            if name in values:
+                if not values.issuperset(avalues):
+                    attr.update(avalues)
+                break
+        role = o.attrs.get("role")
+        if role == None or "alert" not in role.values:
+            o.add_attrs(_role="alert")
+
+
+def patch_table(o):
+    # only updated if not already patched
+    attr = o.attrs.get("class")
+    if attr == None or not set(attr.values).issuperset(TABLE_CLASSES):
+        o.add_attrs(("class", TABLE_CLASSES))
+
+
+TAG2PATCH = {
+    "div": patch_div,
+    "table": patch_table,
+}
+
+
+def patch(o):
+    TAG2PATCH[o.tag](o)
+
+
 def main(rudic, content, root, *args, **kwargs):
     try:
         passthroughs = kwargs.get("passthroughs", [".bhtml"])
         if rudic.rudif.get_extension() not in passthroughs:
-            body = root.find1(Element("body"))
-
-            def patch(o):
-                if type(o) != Element:
-                    return
-
-                # general
-                if o.tag == "table":
-                    o.add_attrs(("class", ["table", "table-striped", "table-hover"]))
-
-                elif o.tag == "div":
-                    attr = o.attrs.get("class")
-                    if attr == None:
-                        return
-
-                    # from markdown
-                    if "admonition" in attr.values:
-                        # in order of likelihood
-                        if "info" in attr.values:
-                            attr.update(["alert", "alert-info"])
-                        elif "note" in attr.values:
-                            attr.update(["alert", "alert-note"])
-                        elif "warning" in attr.values:
-                            attr.update(["alert", "alert-warning"])
-                        elif "tip" in attr.values:
-                            attr.update(["alert", "alert-tip"])
-                        elif "danger" in attr.values:
-                            attr.update(["alert", "alert-danger"])
-                        elif "success" in attr.values:
-                            attr.update(["alert", "alert-success"])
-                        elif "primary" in attr.values:
-                            attr.update(["alert", "alert-primary"])
-                        elif "secondary" in attr.values:
-                            attr.update(["alert", "alert-secondary"])
-                        elif "dark" in attr.values:
-                            attr.update(["alert", "alert-dark"])
-                        elif "light" in attr.values:
-                            attr.update(["alert", "alert-light"])
-                        o.add_attrs(_role="alert")
-
-            body.walk_callback(patch)
+            body = root.get_body()
+            body.walk_by_tags(TAG2PATCH, patch)
 
         return root
     except Exception as e:
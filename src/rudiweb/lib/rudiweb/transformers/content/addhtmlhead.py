@@ -5,17 +5,19 @@
 """Add content to HTML <head> block.
 """
 
-from lib.htmlwriter import Element, HTML5ElementFactory, Raw
+from lib.htmlwriter import HTML5ElementFactory, Raw
+
+HTML_EXTENSIONS = frozenset({".html", ".htm"})
 
 ef = HTML5ElementFactory()
 
 
 def main(rudic, content, root, *args, **kwargs):
     try:
-        if rudic.rudif.get_extension() in [".html", ".htm"]:
+        if rudic.rudif.get_extension() in HTML_EXTENSIONS:
             _content = kwargs.get("_content", None)
 
-            head = root.find1(Element("head"))
+            head = root.get_head()
 
             head.add(Raw(_content))
 
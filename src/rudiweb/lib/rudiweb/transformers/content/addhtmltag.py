@@ -5,10 +5,59 @@
 """Add "tag" to HTML.
 """
 
-from lib.htmlwriter import Element, HTML5ElementFactory, HTMLParser
+from lib.htmlwriter import HTML5ElementFactory, HTMLParser
+from lib.rudiweb.transformers.bootstrap.patchhtml import TAG2PATCH, patch
+
+HTML_EXTENSIONS = frozenset({".html", ".htm"})
 
 ef = HTML5ElementFactory()
 
+TAG_CACHE = {}
+
+
+def make_tag(
+    bgcolor, border_radius, color, html, link, padding, string, style, writing_mode, z_index
+):
+    """Make (frozen) tag element for the settings."""
+    if html:
+        hp = HTMLParser()
+        hp.feed(html)
+        # patched (bootstrap) before freezing, as an unfrozen fragment
+        # would be by patchhtml
+        fragment = hp.get_root()
+        fragment.walk_by_tags(TAG2PATCH, patch)
+        contents = fragment.children
+    elif link:
+        contents = [ef.a(string, _href=link)]
+    else:
+        contents = [string]
+
+    # print(f"{contents=}")
+    return ef.div(
+        *contents,
+        _style=f" position: fixed;"
+        f"writing-mode: {writing_mode};"
+        f"background-color: {bgcolor};"
+        f"border-radius: {border_radius};"
+        f"color: {color};"
+        f"padding: {padding};"
+        f"z-index: {z_index};"
+        f"{style};",
+    ).freeze()
+
+
+def get_tag(*settings):
+    """Get tag element for the settings (see `make_tag()`).
+
+    The element is made once per settings and is frozen. It is shared
+    (across requests and threads) and must not be updated."""
+    # settings come from the (yaml) configuration: repr is stable
+    key = repr(settings)
+    tag = TAG_CACHE.get(key)
+    if tag == None:
+        tag = TAG_CACHE[key] = make_tag(*settings)
+    return tag
+
 
 def main(rudic, content, root, *args, **kwargs):
     """Transformer main.
@@ -27,7 +76,7 @@ def main(rudic, content, root, *args, **kwargs):
         z-index: CSS z-index. Defaults to "100".
     """
     try:
-        if rudic.rudif.get_extension() in [".html", ".htm"]:
+        if rudic.rudif.get_extension() in HTML_EXTENSIONS:
             bgcolor = kwargs.get("bgcolor", "black")
             border_radius = kwargs.get("border-radius", "3px")
             color = kwargs.get("color", "white")
@@ -39,29 +88,19 @@ def main(rudic, content, root, *args, **kwargs):
             writing_mode = kwargs.get("writing-mode", "sideways-lr")
             z_index = kwargs.get("z-index", "100")
 
-            body = root.find1(Element("body"))
-
-            if html:
-                hp = HTMLParser()
-                hp.feed(html)
-                contents = hp.get_root().children
-            elif link:
-                contents = [ef.a(string, _href=link)]
-            else:
-                contents = [string]
-
-            # print(f"{contents=}")
+            body = root.get_body()
             body.add(
-                ef.div(
-                    *contents,
-                    _style=f" position: fixed;"
-                    f"writing-mode: {writing_mode};"
-                    f"background-color: {bgcolor};"
-                    f"border-radius: {border_radius};"
-                    f"color: {color};"
-                    f"padding: {padding};"
-                    f"z-index: {z_index};"
-                    f"{style};",
+                get_tag(
+                    bgcolor,
+                    border_radius,
+                    color,
+                    html,
+                    link,
+                    padding,
+                    string,
+                    style,
+                    writing_mode,
+                    z_index,
                 )
             )
 
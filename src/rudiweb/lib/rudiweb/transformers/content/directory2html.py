@@ -7,9 +7,8 @@
 
 import os
 import os.path
-from pathlib import Path
 
-from lib.htmlwriter import Element, HTML5ElementFactory
+from lib.htmlwriter import HTML5ElementFactory, Raw, escape_quoted, escape_text
 
 
 ef = HTML5ElementFactory()
@@ -17,7 +16,7 @@ ef = HTML5ElementFactory()
 
 def main(rudic, content, root, *args, **kwargs):
     try:
-        body = root.find1(Element("body"))
+        body = root.get_body()
 
         server = rudic.server
         transpath = server.resolve_docpath(rudic.docpath)
@@ -37,38 +36,42 @@ def main(rudic, content, root, *args, **kwargs):
             tbody := ef.tbody(),
         )
 
-        names = os.listdir(transpath)
-        names.sort()
+        # entries carry file type and (cached) stat results
+        with os.scandir(transpath) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+
+        # rows are rendered directly (as the element tree would); large
+        # directories would otherwise need many elements per entry
+        rows = []
+        for entry in entries:
+            name = entry.name
 
-        for name in names:
             # hide index files
             if name in server.index_files:
                 continue
 
-            pp = Path(f"{transpath}/{name}")
-            if pp.is_dir():
+            if entry.is_dir():
                 stem = name
                 ext = "directory"
-                size = pp.stat().st_nlink
+                size = entry.stat().st_nlink
                 name = f"{name}/"
             else:
-                stem = pp.stem
-                ext = pp.suffix[1:]
-                size = pp.stat().st_size
+                stem, ext = os.path.splitext(name)
+                ext = ext[1:]
+                size = entry.stat().st_size
 
             href = f"{docdirname}/{name}"
 
-            tbody.add(
-                ef.tr(
-                    ef.td(ef.a(stem, _href=href)),
-                    ef.td(ext),
-                    ef.td(
-                        str(size),
-                    ),
-                )
+            rows.append(
+                f'<tr><td><a href="{escape_quoted(href)}">{escape_text(stem)}</a></td>\n'
+                f"<td>{escape_text(ext)}</td>\n"
+                f"<td>{size}</td>\n"
+                "</tr>\n"
             )
 
-        if not tbody.children:
+        if rows:
+            tbody.add(Raw("".join(rows)))
+        else:
             tbody.add(ef.tr(ef.td("No items", _colspan="3")))
 
         body.add(
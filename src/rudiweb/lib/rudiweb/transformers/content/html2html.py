@@ -5,12 +5,12 @@
 """Transform raw html to HTMLWriter tree.
 """
 
-from lib.htmlwriter import Element, HTMLParser
+from lib.htmlwriter import HTMLParser
 
 
 def main(rudic, content, root, *args, **kwargs):
     try:
-        if type(content) == bytes:
+        if isinstance(content, bytes):
             content = content.decode("utf-8")
 
         # HTML content -> HTMLWriter tree
@@ -18,11 +18,11 @@ def main(rudic, content, root, *args, **kwargs):
         hp.feed(content)
 
         newroot = hp.get_root()
-        if newroot.find1(Element("html")):
+        if newroot.find1_tag("html"):
             # full document; use newroot instead
             return newroot
         else:
-            body = root.find1(Element("body"))
+            body = root.get_body()
             body.add(*hp.get_root().children)
             return root
     except Exception as e:
@@ -7,7 +7,7 @@
 
 import base64
 
-from lib.htmlwriter import Element, HTML5ElementFactory
+from lib.htmlwriter import HTML5ElementFactory
 
 
 ef = HTML5ElementFactory()
@@ -47,7 +47,7 @@ def main(rudic, content, root, *args, **kwargs):
         imgtype (str): Image type (e.g., "png").
     """
     try:
-        body = root.find1(Element("body"))
+        body = root.get_body()
         body.add(ef.h1("Image"))
 
         imgtype = kwargs.get("imgtype")
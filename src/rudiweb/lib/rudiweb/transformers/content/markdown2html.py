@@ -5,9 +5,11 @@
 """Transform Markdown to HTML.
 """
 
+import threading
+
 import markdown
 
-from lib.htmlwriter import Element, HTML5ElementFactory, HTMLParser
+from lib.htmlwriter import HTML5ElementFactory, HTMLParser
 
 
 MARKDOWN_EXTENSIONS = [
@@ -21,7 +23,38 @@ MARKDOWN_EXTENSIONS = [
 
 ef = HTML5ElementFactory()
 
-# TODO: instantiate markdown with extensions to speed up
+# shared pool of idle `Markdown` instances (not reentrant), by
+# extensions
+MARKDOWN_POOL = {}
+MARKDOWN_POOL_LOCK = threading.Lock()
+
+# idle instances kept per extensions
+MARKDOWN_POOL_SIZE = 8
+
+
+def get_markdown(extensions):
+    """Get (reset) `Markdown` instance for extensions; return it with
+    `put_markdown()`.
+
+    Setting up an instance loads and registers all extensions, which
+    costs more than converting most documents. So, idle instances are
+    shared by all threads (connection threads are short-lived)."""
+    key = repr(extensions)
+    with MARKDOWN_POOL_LOCK:
+        idle = MARKDOWN_POOL.get(key)
+        md = idle.pop() if idle else None
+    if md == None:
+        md = markdown.Markdown(extensions=extensions, output_format="html")
+    return md.reset()
+
+
+def put_markdown(extensions, md):
+    """Return `Markdown` instance (see `get_markdown()`)."""
+    key = repr(extensions)
+    with MARKDOWN_POOL_LOCK:
+        idle = MARKDOWN_POOL.setdefault(key, [])
+        if len(idle) < MARKDOWN_POOL_SIZE:
+            idle.append(md)
 
 
 def main(rudic, content, root, *args, **kwargs):
@@ -31,16 +64,21 @@ def main(rudic, content, root, *args, **kwargs):
         extensions (list): Markdown extensions by name.
     """
     try:
-        if type(content) == bytes:
+        if isinstance(content, bytes):
             content = content.decode("utf-8")
 
         extensions = kwargs.get("extensions", [])
 
         # markdown content -> HTML -> HTMLWriter tree
+        md = get_markdown(extensions)
+        try:
+            html = md.convert(content)
+        finally:
+            put_markdown(extensions, md)
         hp = HTMLParser()
-        hp.feed(markdown.markdown(content, extensions=extensions, output_format="html"))
+        hp.feed(html)
 
-        body = root.find1(Element("body"))
+        body = root.get_body()
         body.add(*hp.get_root().children)
 
         return root
@@ -5,7 +5,7 @@
 """Transform plain text to HTML.
 """
 
-from lib.htmlwriter import Element, HTML5ElementFactory
+from lib.htmlwriter import HTML5ElementFactory
 
 
 ef = HTML5ElementFactory()
@@ -13,11 +13,12 @@ ef = HTML5ElementFactory()
 
 def main(rudic, content, root, *args, **kwargs):
     try:
-        if type(content) == bytes:
+        if isinstance(content, bytes):
             content = content.decode("utf-8")
 
-        body = root.find1(Element("body"))
-        body.add(ef.pre(content.replace("<", "&lt;")))
+        body = root.get_body()
+        # text is escaped (once) when rendered
+        body.add(ef.pre(content))
 
         return root
     except Exception as e:
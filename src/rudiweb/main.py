@@ -23,8 +23,10 @@
 Classes:
 
 * `RudiAccess`
+* `RudiBytesCache`
 * `RudiConfig`
 * `RudiFile`
+* `RudiFileCache`
 * `RudiHandler`
 * `RudiServer`
 * `RudiSpace`
@@ -35,7 +37,10 @@ __VERSION__ = "0.3"
 
 import base64
 import calendar
+from collections import OrderedDict
 from email.utils import formatdate, parsedate
+import functools
+import hmac
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import importlib
@@ -43,15 +48,24 @@ import logging
 import os
 import os.path
 import pathlib
+import posixpath
 import re
 import secrets
+import signal
+import socket
 import stat
-import subprocess
 import sys
+import threading
+import time
 import traceback
 from urllib.parse import unquote, urlparse
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 from lib.htmlwriter import HTML5ElementFactory, HTMLWriter, escape
 
 logger = logging.getLogger(__name__)
@@ -72,6 +86,7 @@ CGI_REQUEST_HEADERS = {
 
 DEFAULT_SPACE_TYPE = "asis"
 
+# standard support; not updated (see `RudiSpace.setup_extensions()`)
 EXT_TO_CONTENTTYPE = {
     ".aac": "audio/aac",
     ".avi": "video/x-msvideo",
@@ -136,12 +151,55 @@ EXT_TO_CONTENTTYPE = {
     None: "application/octet-stream",
 }
 
-ASIS_EXTENSIONS = set(EXT_TO_CONTENTTYPE.keys())
-for key in [".html", None]:
-    ASIS_EXTENSIONS.discard(key)
+DEFAULT_CONTENTTYPE = EXT_TO_CONTENTTYPE[None]
+
+ASIS_EXTENSIONS = frozenset(EXT_TO_CONTENTTYPE.keys() - {".html", None})
 
 DECORATABLE_EXTENSIONS = [".html"]
 
+# authorized "Authorization" header values cache
+AUTHORIZATION_CACHE_SIZE = 1024
+
+# docpath lookup caches
+DOCPATH_CACHE_SIZE = 4096
+INDEX_FILE_CACHE_TTL = 1.0
+
+# file status (`os.stat()`) cache, in seconds (default)
+STAT_CACHE_TTL = 0.5
+
+# formatted/parsed HTTP-Date caches
+HTTP_DATE_CACHE_SIZE = 4096
+
+# file contents cache
+FILE_CACHE_MAX_SIZE = 64 << 20
+FILE_CACHE_MAX_FILE_SIZE = 512 << 10
+
+# decorated (transformed) static HTML cache
+DECORATED_CACHE_MAX_SIZE = 32 << 20
+DECORATED_CACHE_MAX_ENTRY_SIZE = 1 << 20
+
+# bundled transformers whose output depends only on the file content
+# and transformer args (i.e., not on other files, request, ...); by
+# either package path
+PURE_TRANSFORMERS = frozenset(
+    f"{prefix}rudiweb.transformers.{name}.main"
+    for prefix in ["", "lib."]
+    for name in [
+        "bootstrap.decorate",
+        "bootstrap.html2bhtml",
+        "bootstrap.patchhtml",
+        "content.addhtmlhead",
+        "content.addhtmltag",
+        "content.html2html",
+        "content.image2html",
+        "content.markdown2html",
+        "content.txt2html",
+    ]
+)
+
+# Linux only
+TCP_CORK = getattr(socket, "TCP_CORK", None)
+
 # available globally
 server = None
 
@@ -154,25 +212,42 @@ class RudiAccess:
     def __init__(self, topconfig):
         self.config = topconfig
 
+        # read once (config is not updated after setup)
+        self.require_authorization = self.config.get("require-authorization", True) != False
+        self.passwords = {}
+        for user, account in (self.config.get("accounts") or {}).items():
+            passwd = account.get("password")
+            if isinstance(passwd, str):
+                self.passwords[user] = passwd.encode("utf-8")
+
+        # authorization header values already checked and authorized
+        self.authorized = {}
+
     def is_authorized(self, headers, docpath):
         """Check if authorization is required for document."""
         try:
             # TODO: support realms by docpath
-            if self.config.get("require-authorization", True) == False:
+            if not self.require_authorization:
                 return True
             else:
                 authorization = headers.get("Authorization")
                 if not authorization:
                     return False
+                if authorization in self.authorized:
+                    return True
 
-                authkind, authuserpasswd = authorization.split(None, 1)
-                if authkind.lower() != "basic":
+                # cheap reject of non-"Basic" (case-insensitive) schemes
+                if authorization[:5].lower() != "basic" or not authorization[5:6].isspace():
                     return False
 
-                userpasswd = base64.b64decode(authuserpasswd).decode("utf-8")
+                userpasswd = base64.b64decode(authorization[6:].strip()).decode("utf-8")
                 user, passwd = userpasswd.split(":")
-                if self.config.get("accounts", {}).get(user, {}).get("password") == passwd:
-                    logger.debug(f"authorized user ({user=})")
+                expected = self.passwords.get(user)
+                if expected != None and hmac.compare_digest(expected, passwd.encode("utf-8")):
+                    logger.debug("authorized user (user=%r)", user)
+                    if len(self.authorized) >= AUTHORIZATION_CACHE_SIZE:
+                        self.authorized.clear()
+                    self.authorized[authorization] = user
                     return True
         except Exception as e:
             if server.debug:
@@ -216,7 +291,7 @@ class RudiFile:
 
     Note: Depends on global `server` for some information."""
 
-    def __init__(self, handler, docpath, dtype=None, fallback=None):
+    def __init__(self, handler, docpath, dtype=None, fallback=None, rudis=None):
         # TODO: should upgrade be done by caller?
         docpath = server.upgrade_index_file(docpath)
 
@@ -232,12 +307,10 @@ class RudiFile:
             self.nameroot, self.nameext = os.path.splitext(self.docpath)
         else:
             self.nameroot, self.nameext = None, None
-        self.content_type = EXT_TO_CONTENTTYPE.get(self.nameext, EXT_TO_CONTENTTYPE.get(None))
+        ext2contenttype = rudis.ext2contenttype if rudis != None else EXT_TO_CONTENTTYPE
+        self.content_type = ext2contenttype.get(self.nameext, DEFAULT_CONTENTTYPE)
 
-        try:
-            self.st = os.stat(self.path)
-        except:
-            self.st = None
+        self.set_stat(server.stat(self.path))
 
     def _execute(self):
         """Execute file.
@@ -245,13 +318,31 @@ class RudiFile:
         Returns:
             Results as `str` or `bytes`. None on failure."""
         try:
-            cp = subprocess.run(
-                [self.path],
-                capture_output=True,
-                text=(self.dtype == "t"),
-                env=self.get_cgi_variables(),
-            )
-            return cp.stdout
+            # spawn directly (no fork of the server); stdout via pipe
+            # (text mode decodes as `subprocess` would: locale encoding,
+            # universal newlines), stderr discarded
+            r, w = os.pipe()
+            with open(r, "r" if self.dtype == "t" else "rb") as f:
+                try:
+                    pid = os.posix_spawn(
+                        self.path,
+                        [self.path],
+                        self.get_cgi_variables(),
+                        file_actions=[
+                            (os.POSIX_SPAWN_DUP2, w, 1),
+                            (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0),
+                        ],
+                        # default dispositions, not the server's ignored ones
+                        # (as `restore_signals`)
+                        setsigdef=(signal.SIGPIPE, signal.SIGXFSZ),
+                    )
+                finally:
+                    os.close(w)
+                try:
+                    return f.read()
+                finally:
+                    # always reap
+                    os.waitpid(pid, 0)
         except Exception as e:
             if server.debug:
                 traceback.print_exc()
@@ -264,13 +355,16 @@ class RudiFile:
             Results as `str` or `bytes`. None on failure."""
         try:
             if self.exists():
+                if self.dtype != "t" and server.file_cache.is_cacheable(self.get_size()):
+                    return server.file_cache.read(self.path, self.st)
+
                 plp = pathlib.Path(self.path)
                 if self.dtype == "t":
                     return plp.read_text()
                 else:
                     return plp.read_bytes()
             else:
-                logger.debug(f"file not found ({self.path})")
+                logger.debug("file not found (%s)", self.path)
                 return self.fallback
         except Exception as e:
             if server.debug:
@@ -280,16 +374,67 @@ class RudiFile:
     def exists(self):
         return self.st != None
 
+    def open_current(self):
+        """Open file (binary) and update status from the open file.
+
+        The (cached) status may be out of date; sizes, etc. must match
+        what is read from the returned file.
+
+        Returns:
+            File object. None on failure."""
+        try:
+            f = open(self.path, "rb")
+        except Exception as e:
+            logger.debug(f"EXCEPTION ({e})")
+            return None
+
+        st = os.fstat(f.fileno())
+        if st.st_mtime_ns != self._mtime_ns or st.st_size != self._size:
+            self.set_stat(st)
+        return f
+
+    def sendfile(self, sock, count, f=None):
+        """Send (up to count bytes of) file contents to socket, from
+        the file object f (see `open_current()`), if given.
+
+        Uses `os.sendfile()` (zero-copy) when supported by the socket.
+
+        Returns:
+            Number of bytes sent. None on failure."""
+        try:
+            if f != None:
+                return sock.sendfile(f, 0, count)
+            with open(self.path, "rb") as f:
+                return sock.sendfile(f, 0, count)
+        except Exception as e:
+            if server.debug:
+                traceback.print_exc()
+            logger.debug(f"EXCEPTION ({e})")
+
+    def set_stat(self, st):
+        """Set (and decode once) file status."""
+        self.st = st
+        if st != None:
+            mode = st.st_mode
+            self._is_dir = stat.S_ISDIR(mode)
+            self._is_exec = mode & stat.S_IXUSR != 0
+            self._is_file = stat.S_ISREG(mode)
+            self._mtime = st.st_mtime
+            self._mtime_ns = st.st_mtime_ns
+            self._size = st.st_size
+        else:
+            self._is_dir = self._is_exec = self._is_file = False
+            self._mtime = self._mtime_ns = self._size = 0
+
     def get_cgi_variables(self):
         """Get dictionary of CGI variables.
 
         Request docpath is different from script docpath. This is
         important when includes/decorations are processed.
         """
-        parsed = urlparse(self.handler.path)
+        parsed = self.handler.parsed_path
 
-        # TODO: trim some environ variables?
-        env = os.environ.copy()
+        env = server.cgi_environ.copy()
 
         # add CGI-specific variables
         env.update(
@@ -338,30 +483,58 @@ class RudiFile:
         """Get extension from docpath."""
         return self.nameext
 
+    def get_static_headers(self):
+        """Get encoded header block (content type and length, cache
+        control) for sending the file as-is.
+
+        Cached per file version (path, modification time, size)."""
+        key = (self.path, self._mtime_ns, self._size)
+        block = server.static_headers_cache.get(key)
+        if block == None:
+            block = format_headers(
+                [
+                    ("Content-Type", self.content_type),
+                    ("Content-Length", self._size),
+                    ("Cache-Control", "max-age=120"),
+                    ("Last-Modified", self.get_http_date()),
+                ]
+            )
+            if len(server.static_headers_cache) >= DOCPATH_CACHE_SIZE:
+                server.static_headers_cache.clear()
+            server.static_headers_cache[key] = block
+        return block
+
+    def get_size(self):
+        """Get file size."""
+        return self._size
+
     def get_http_date(self):
         """Get modification time for non-executable in HTTP-Date
         format."""
-        if not self.is_executable():
-            return formatdate(self.st.st_mtime, usegmt=True)
+        if self.st != None and not self._is_exec:
+            return format_http_date(int(self._mtime))
 
     def is_dir(self):
         """Return if directory file type or not."""
-        return stat.S_ISDIR(self.st.st_mode) != 0 if self.st != None else False
+        return self._is_dir
 
     def is_executable(self):
         """Return if executable or not."""
-        return self.st.st_mode & stat.S_IXUSR != 0 if self.st != None else False
+        return self._is_exec
 
     def is_file(self):
         """Return if regular file type or not."""
-        return stat.S_ISREG(self.st.st_mode) != 0 if self.st != None else False
+        return self._is_file
+
+    def is_static(self):
+        """Return if regular, non-executable file or not. Such a file
+        can be sent without being loaded."""
+        return self._is_file and not self._is_exec
 
     def is_newer(self, httpdate):
         """Return if given httpdate is newer than file modification
         time or not."""
-        return (
-            calendar.timegm(parsedate(httpdate)) > self.st.st_mtime if self.st != None else False
-        )
+        return parse_http_date(httpdate) > self._mtime if self.st != None else False
 
     def load(self):
         """Load content. May be from regular file or executed results."""
@@ -380,16 +553,100 @@ class RudiFile:
                 return "" if self.dtype == "t" else b""
 
 
+class RudiBytesCache:
+    """Size-bounded, least recently used cache of `bytes`.
+
+    Entries are stored with a version and only returned for a matching
+    version."""
+
+    def __init__(self, max_size, max_entry_size):
+        self.max_size = max_size
+        self.max_entry_size = max_entry_size
+
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.size = 0
+
+    def is_cacheable(self, size):
+        """Return if entry of size may be cached or not."""
+        return size <= self.max_entry_size
+
+    def get(self, key, version):
+        """Get data for key and version. `None` if not cached."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry != None and entry[0] == version:
+                self.entries.move_to_end(key)
+                return entry[1]
+        return None
+
+    def put(self, key, version, data):
+        """Put data for key and version (if cacheable)."""
+        if not self.is_cacheable(len(data)):
+            return
+
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry != None:
+                self.size -= len(entry[1])
+            self.entries[key] = (version, data)
+            self.size += len(data)
+
+            while self.size > self.max_size:
+                _, entry = self.entries.popitem(last=False)
+                self.size -= len(entry[1])
+
+
+class RudiFileCache(RudiBytesCache):
+    """Size-bounded, least recently used cache of file contents.
+
+    Entries are keyed by path and validated against the file
+    modification time and size."""
+
+    def read(self, path, st):
+        """Read file contents (as `bytes`), from the cache if valid for
+        `st` (from `os.stat()`)."""
+        version = (st.st_mtime_ns, st.st_size)
+        data = self.get(path, version)
+        if data != None:
+            return data
+
+        data = pathlib.Path(path).read_bytes()
+
+        # only cache if unchanged since stat
+        if len(data) == st.st_size:
+            self.put(path, version, data)
+
+        return data
+
+
 class RudiHandler(BaseHTTPRequestHandler):
     """Handler for all requests."""
 
     server_version = f"rudiweb/{__VERSION__}"
 
+    # (timestamp, HTTP-Date) for `date_time_string()`
+    _date_cache = (None, None)
+
     def __init__(self, *args, **kwargs):
         # note: super() calls handler in its `__init__`!
         super().__init__(*args, **kwargs)
         # note: does not get here until close
 
+    def date_time_string(self, timestamp=None):
+        """Return HTTP-Date string.
+
+        The current time (i.e., no timestamp) string is shared for the
+        second (the resolution of HTTP-Date)."""
+        if timestamp != None:
+            return super().date_time_string(timestamp)
+
+        now = int(time.time())
+        cached = RudiHandler._date_cache
+        if cached[0] != now:
+            cached = RudiHandler._date_cache = (now, formatdate(now, usegmt=True))
+        return cached[1]
+
     def do_GET(self):
         self.do_ALL()
 
@@ -407,14 +664,12 @@ class RudiHandler(BaseHTTPRequestHandler):
         `do_POST`)."""
 
         # get docpath (cleaned up)
-        parsed = urlparse(self.path)
-        docpath = os.path.abspath(unquote(parsed.path))
-        if parsed.path.endswith("/") and parsed.path != "/":
-            docpath = f"{docpath}/"
+        self.parsed_path = urlparse(self.path)
+        docpath = clean_docpath(self.parsed_path.path)
 
         # setup `RudiSpace`, `RudiFile`
         rudis = self.server.get_space(docpath)
-        rudif = RudiFile(self, docpath)
+        rudif = RudiFile(self, docpath, rudis=rudis)
 
         # setup `RudiContext`
         rudic = RudiContext(docpath, self.server, self, rudis, rudif)
@@ -445,7 +700,7 @@ class RudiHandler(BaseHTTPRequestHandler):
             self.do_404_response(rudic)
             return
 
-        logger.debug(f"{rudic.rudif.docpath=}")
+        logger.debug("rudic.rudif.docpath=%r", rudic.rudif.docpath)
         # generate response
         if rudis.type == "asis":
             modified_since = self.headers.get("If-Modified-Since")
@@ -465,7 +720,7 @@ class RudiHandler(BaseHTTPRequestHandler):
 
         Redirect to a new location."""
         status = HTTPStatus.MOVED_PERMANENTLY
-        logger.debug(f"""{status.value} {status.phrase}""")
+        logger.debug("%s %s", status.value, status.phrase)
 
         self.send_response(status)
         self.send_header("Location", location)
@@ -476,7 +731,7 @@ class RudiHandler(BaseHTTPRequestHandler):
 
         Headers with *no* body."""
         status = HTTPStatus.NOT_MODIFIED
-        logger.debug(f"""{status.value} {status.phrase}""")
+        logger.debug("%s %s", status.value, status.phrase)
 
         self.send_response(status)
         self.end_headers()
@@ -486,7 +741,7 @@ class RudiHandler(BaseHTTPRequestHandler):
 
         Require authentication info in request."""
         status = HTTPStatus.UNAUTHORIZED
-        logger.debug(f"""{status.value} {status.phrase}""")
+        logger.debug("%s %s", status.value, status.phrase)
 
         self.send_response(status)
         self.send_header("WWW-Authenticate", 'Basic realm="site"')
@@ -495,7 +750,7 @@ class RudiHandler(BaseHTTPRequestHandler):
     def do_404_response(self, rudic):
         """404 Not Found response."""
         status = HTTPStatus.NOT_FOUND
-        logger.debug(f"""{status.value} {status.phrase}""")
+        logger.debug("%s %s", status.value, status.phrase)
 
         self.send_response(status)
         rudic.rudif.fallback = f"""\
@@ -512,19 +767,28 @@ class RudiHandler(BaseHTTPRequestHandler):
 
         Note: All purely static content is subject to caching."""
 
+        f = None
         try:
-            logger.debug(f"do_asis_response ({rudic.docpath=})")
-
-            # load initial content
-            content = rudic.rudif.load()
+            logger.debug("do_asis_response (rudic.docpath=%r)", rudic.docpath)
 
             # TODO: avoid redundant checked if called from do_default_response()
-            if rudic.rudif.get_extension() in ASIS_EXTENSIONS:
-                payload = content
+            static = rudic.rudif.get_extension() in ASIS_EXTENSIONS and rudic.rudif.is_static()
+            if static and not server.file_cache.is_cacheable(rudic.rudif.get_size()):
+                # (large) headers from the opened file, which is sent
+                # directly by `write_file_payload()`
+                f = rudic.rudif.open_current()
+
+            if f != None:
+                payload = None
+            elif rudic.rudif.get_extension() in ASIS_EXTENSIONS:
+                payload = rudic.rudif.load()
             else:
+                # load initial content
+                content = rudic.rudif.load()
+
                 # apply transformers
                 transformers = rudic.rudis.get_transformers(rudic.rudif.get_extension())
-                logger.debug(f"transformers ({transformers})")
+                logger.debug("transformers (%s)", transformers)
                 if transformers:
                     # load initial document
                     hw = HTMLWriter()
@@ -548,20 +812,44 @@ class RudiHandler(BaseHTTPRequestHandler):
                 else:
                     payload = content
 
-            self.send_header("Content-Type", rudic.rudif.get_content_type())
-            self.send_header("Content-Length", str(len(payload)))
-
-            last_modified = rudic.rudif.get_http_date()
-            if last_modified:
-                self.send_header("Cache-Control", "max-age=120")
-                self.send_header("Last-Modified", last_modified)
-            self.end_headers()
+            if payload == None:
+                length = rudic.rudif.get_size()
+            else:
+                if isinstance(payload, str):
+                    payload = payload.encode("utf-8")
+                length = len(payload)
 
-            self.write_payload(payload)
+            if static and length == rudic.rudif.get_size():
+                # prebuilt for the file (version)
+                self.send_header_block(rudic.rudif.get_static_headers())
+            else:
+                headers = [
+                    ("Content-Type", rudic.rudif.get_content_type()),
+                    ("Content-Length", length),
+                ]
+                last_modified = rudic.rudif.get_http_date()
+                if last_modified:
+                    headers.append(("Cache-Control", "max-age=120"))
+                    headers.append(("Last-Modified", last_modified))
+                self.send_headers(*headers)
+
+            if payload == None:
+                # headers and start of file in full segments
+                self.set_cork(True)
+                try:
+                    self.end_headers()
+                    self.write_file_payload(rudic.rudif, length, f)
+                finally:
+                    self.set_cork(False)
+            else:
+                self.end_headers_with_payload(payload)
         except Exception as e:
             if server.debug:
                 traceback.print_exc()
             logger.debug(f"EXCEPTION ({e})")
+        finally:
+            if f != None:
+                f.close()
 
     def do_debug_response(self, rudic):
         """Test response for debugging."""
@@ -573,21 +861,42 @@ class RudiHandler(BaseHTTPRequestHandler):
             f"{self.path=}\n",
             "</pre>\n",
         ]
-        payload = "".join(parts)
+        payload = "".join(parts).encode("utf-8")
 
         self.send_response(200)
-        self.send_header("Content-Type", "text/html")
-        self.send_header("Content-Length", str(len(payload)))
+        self.send_headers(
+            ("Content-Type", "text/html"),
+            ("Content-Length", len(payload)),
+        )
         self.end_headers()
 
         self.write_payload(payload)
 
     def do_decorated_response(self, rudic):
         """Response with decorated HTML content."""
-        logger.debug(f"do_decorated_response ({rudic.docpath=})")
+        logger.debug("do_decorated_response (rudic.docpath=%r)", rudic.docpath)
+
+        # static files decorate the same for the same file version, if
+        # the space allows it for the (pure) transformer chain
+        rudif = rudic.rudif
+        if rudif.is_static() and rudic.rudis.is_decorated_cacheable(rudif.get_extension()):
+            key = (rudic.rudis, rudic.docpath, rudif.path)
+            version = (rudif._mtime_ns, rudif._size)
+            payload = server.decorated_cache.get(key, version)
+            if payload == None:
+                payload = self.render_decorated(rudic)
+                server.decorated_cache.put(key, version, payload)
+        else:
+            payload = self.render_decorated(rudic)
 
-        parts = []
+        self.send_headers(
+            ("Content-Type", "text/html"),
+            ("Content-Length", len(payload)),
+        )
+        self.end_headers_with_payload(payload)
 
+    def render_decorated(self, rudic):
+        """Render decorated HTML content (as `bytes`)."""
         # load initial document
         hw = HTMLWriter()
         ef = HTML5ElementFactory()
@@ -598,7 +907,7 @@ class RudiHandler(BaseHTTPRequestHandler):
 
         # apply transformers
         transformers = rudic.rudis.get_transformers(rudic.rudif.get_extension())
-        logger.debug(f"transformers ({transformers})")
+        logger.debug("transformers (%s)", transformers)
         if transformers:
             try:
                 for transformer in transformers:
@@ -606,13 +915,7 @@ class RudiHandler(BaseHTTPRequestHandler):
             except Exception as e:
                 raise
 
-        payload = hw.render()
-
-        self.send_header("Content-Type", "text/html")
-        self.send_header("Content-Length", str(len(payload)))
-        self.end_headers()
-
-        self.write_payload(payload)
+        return hw.render().encode("utf-8")
 
     def do_default_response(self, rudic):
         """Main method to respond according to name extension.
@@ -625,10 +928,15 @@ class RudiHandler(BaseHTTPRequestHandler):
         taken as the body.
         """
         try:
-            logger.debug(f"do_default_response ({rudic.docpath=})")
+            logger.debug("do_default_response (rudic.docpath=%r)", rudic.docpath)
 
             ext = rudic.rudif.get_extension()
-            if rudic.rudis.type == "asis" or ext in ASIS_EXTENSIONS:
+            # cheap tests first; regexps only if still undecided
+            if (
+                rudic.rudis.type == "asis"
+                or ext in ASIS_EXTENSIONS
+                or server.match_asis_document(rudic.docpath)
+            ):
                 self.do_asis_response(rudic)
             elif rudic.rudis.type == "html" or ext in DECORATABLE_EXTENSIONS:
                 self.do_decorated_response(rudic)
@@ -639,16 +947,70 @@ class RudiHandler(BaseHTTPRequestHandler):
                 traceback.print_exc()
             logger.debug(f"EXCEPTION ({e})")
 
+    def end_headers_with_payload(self, payload):
+        """End headers and write (`bytes`) payload to stream.
+
+        Same as `end_headers()` followed by `write_payload()`, but the
+        header block and payload are sent with a single gathered
+        write."""
+        if self.command not in ["GET"] or not hasattr(self, "_headers_buffer"):
+            self.end_headers()
+            self.write_payload(payload)
+            return
+
+        self._headers_buffer.append(b"\r\n")
+        buffers = self._headers_buffer + [payload]
+        self._headers_buffer = []
+        try:
+            sendmsg_all(self.connection, buffers)
+        except NotImplementedError:
+            # e.g., SSL socket
+            self.wfile.write(b"".join(buffers))
+
+    def send_headers(self, *headers):
+        """Add headers to the headers buffer.
+
+        Like multiple `send_header()` calls, but formatted and encoded
+        as a single block.
+
+        Args:
+            headers (list): List of (name, value) tuples.
+        """
+        self.send_header_block(format_headers(headers))
+
+    def send_header_block(self, block):
+        """Add (encoded) header block to the headers buffer.
+
+        Args:
+            block (bytes): Header lines (see `format_headers()`).
+        """
+        if self.request_version != "HTTP/0.9":
+            if not hasattr(self, "_headers_buffer"):
+                self._headers_buffer = []
+            self._headers_buffer.append(block)
+
+    def set_cork(self, enable):
+        """Set/clear `TCP_CORK` (where supported) on the connection.
+
+        While set, partial segments are held back (e.g., headers
+        written separately from a following `sendfile()`)."""
+        if TCP_CORK != None:
+            try:
+                self.connection.setsockopt(socket.IPPROTO_TCP, TCP_CORK, 1 if enable else 0)
+            except OSError:
+                pass
+
     def write(self, buf):
         """Convert/ensure buf to bytes as needed for the underlying
-        byte stream.
+        byte stream. Bytes-like objects (e.g., `memoryview`) are
+        written as is.
 
         *All* writes must use this method."""
         try:
-            if type(buf) == str:
-                self.wfile.write(bytes(buf, "utf-8"))
-            elif type(buf) == bytes:
+            if isinstance(buf, (bytes, bytearray, memoryview)):
                 self.wfile.write(buf)
+            elif isinstance(buf, str):
+                self.wfile.write(buf.encode("utf-8"))
             else:
                 raise Exception(f"unsupported data type ({type(buf)}")
         except Exception as e:
@@ -656,10 +1018,29 @@ class RudiHandler(BaseHTTPRequestHandler):
                 traceback.print_exc()
             logger.debug(f"EXCEPTION ({e})")
 
+    def write_bytes(self, buf):
+        """Write bytes to the underlying byte stream.
+
+        Fast path of `write()` for known `bytes`; errors are left to
+        the caller."""
+        self.wfile.write(buf)
+
+    def write_file_payload(self, rudif, count, f=None):
+        """Write file contents as payload to stream (from file object
+        f, if given)."""
+        if self.command in ["GET"]:
+            if rudif.sendfile(self.connection, count, f) != count:
+                # short (e.g., truncated file): do not leave the client
+                # waiting for the rest
+                self.close_connection = True
+
     def write_payload(self, payload):
-        """Write payload to stream."""
+        """Write payload (`bytes` or `str`) to stream."""
         if self.command in ["GET"]:
-            self.write(payload)
+            if isinstance(payload, bytes):
+                self.write_bytes(payload)
+            else:
+                self.write(payload)
 
 
 class RudiServer(ThreadingHTTPServer):
@@ -682,10 +1063,13 @@ class RudiServer(ThreadingHTTPServer):
 
         # setup
         self.setup_access()
-        # self.setup_asis()
+        self.setup_asis()
+        self.setup_caches()
+        self.setup_cgi()
         self.setup_index_files()
         self.setup_space_order()
         self.setup_spaces()
+        self.setup_threads()
 
         # init superclass
         logger.debug(f"{self.site_root=} {self.document_root=} {self.rudi_root}")
@@ -697,6 +1081,16 @@ class RudiServer(ThreadingHTTPServer):
 
     def get_space(self, docpath):
         """Return match of space for docpath."""
+        return self._get_space(docpath)
+
+    def _get_space(self, docpath):
+        """Uncached `get_space()`. See `setup_caches()`."""
+        if self.space_cregexp != None:
+            m = self.space_cregexp.match(docpath)
+            if m:
+                return self.spaces[self.space_groups[m.lastgroup]]
+            return None
+
         for spacename in self.spaceorder:
             rudis = self.spaces.get(spacename)
             if rudis.is_match(docpath):
@@ -704,22 +1098,41 @@ class RudiServer(ThreadingHTTPServer):
 
     def match_asis_document(self, docpath):
         """Return match for asis settings."""
-        for cregexp in self.asis_cregexps:
-            m = cregexp.match(docpath)
-            if m:
-                return m
+        if self.asis_cregexp != None:
+            return self.asis_cregexp.match(docpath)
+
+    def process_request(self, request, client_address):
+        """Handle request in a pooled thread, if configured (see
+        `setup_threads()`), otherwise in a new thread."""
+        if self.thread_pool == None:
+            super().process_request(request, client_address)
+        else:
+            with self.pool_requests_lock:
+                self.pool_requests.add(request)
+            self.thread_pool.submit(self.process_request_pooled, request, client_address)
+
+    def process_request_pooled(self, request, client_address):
+        """Handle request in a pooled thread (see `process_request()`)."""
+        try:
+            self.process_request_thread(request, client_address)
+        finally:
+            with self.pool_requests_lock:
+                self.pool_requests.discard(request)
 
     def resolve_docpath(self, docpath):
         """Get real path from path for the docpath."""
         if docpath != None:
-            if docpath.startswith("/.rudi/"):
-                relpath = docpath[6:]
-                basepath = self.rudi_root
-            else:
-                relpath = docpath
-                basepath = self.document_root
+            return self._resolve_docpath(docpath)
+        return None
+
+    def _resolve_docpath(self, docpath):
+        """Uncached `resolve_docpath()`. See `setup_caches()`."""
+        if docpath.startswith("/.rudi/"):
+            relpath = docpath[6:]
+            basepath = self.rudi_root
         else:
-            return None
+            relpath = docpath
+            basepath = self.document_root
 
         relpath = os.path.abspath(f"/{relpath}")
         path = os.path.normpath(f"{basepath}{relpath}")
@@ -733,15 +1146,61 @@ class RudiServer(ThreadingHTTPServer):
             return f"{self.site_root}/{sitepath}"
         return None
 
+    def server_close(self):
+        """Close server. Pooled threads are not daemonic (and joined at
+        exit), so queued requests are dropped and connections still
+        being handled (e.g., idle keep-alive) are shut down."""
+        super().server_close()
+        if self.thread_pool != None:
+            self.thread_pool.shutdown(wait=False, cancel_futures=True)
+            with self.pool_requests_lock:
+                requests = list(self.pool_requests)
+            for request in requests:
+                try:
+                    request.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
     def setup_access(self):
         self.rudi_access = RudiAccess(self.config)
 
     def setup_asis(self):
         # TODO: move this out of server (but ensure it is computed once?)
-        self.asis_cregexps = [
-            re.compile(x)
-            for x in self.config.get("content", {}).get("asis", {}).get("regexps", [])
-        ]
+        regexps = self.config.get("content", {}).get("asis", {}).get("regexps", [])
+
+        # single alternation: one call into the regexp engine per match
+        if regexps:
+            self.asis_cregexp = re.compile("|".join(f"(?:{x})" for x in regexps))
+        else:
+            self.asis_cregexp = None
+
+    def setup_caches(self):
+        """Set up docpath lookup, file contents and decorated content
+        caches.
+
+        The docpath to path and space mappings only depend on the
+        (fixed) roots and space configuration. Index file upgrades
+        depend on the filesystem and are only trusted for
+        `INDEX_FILE_CACHE_TTL` seconds, as are file status results for
+        `stat-cache-ttl` seconds."""
+        self._resolve_docpath = functools.lru_cache(maxsize=DOCPATH_CACHE_SIZE)(
+            self._resolve_docpath
+        )
+        self._get_space = functools.lru_cache(maxsize=DOCPATH_CACHE_SIZE)(self._get_space)
+        self.index_file_cache = {}
+        self.stat_cache = {}
+        self.stat_cache_ttl = self.config.get("stat-cache-ttl", STAT_CACHE_TTL)
+        self.static_headers_cache = {}
+        self.file_cache = RudiFileCache(FILE_CACHE_MAX_SIZE, FILE_CACHE_MAX_FILE_SIZE)
+        self.decorated_cache = RudiBytesCache(
+            DECORATED_CACHE_MAX_SIZE, DECORATED_CACHE_MAX_ENTRY_SIZE
+        )
+
+    def setup_cgi(self):
+        """Set up baseline environment for executables (snapshot of
+        the server environment)."""
+        # TODO: trim some environ variables?
+        self.cgi_environ = dict(os.environ)
 
     def setup_index_files(self):
         self.index_files = self.config.get("index-files", ["index.html"])
@@ -750,10 +1209,38 @@ class RudiServer(ThreadingHTTPServer):
         self.spaceorder = self.config.get("space-order", [])
 
     def setup_spaces(self):
+        """Set up spaces and the space matching regexp.
+
+        Regexps of all spaces (in space order) are combined into a
+        single alternation with a named group per space: the first
+        match (and group) is the same as for trying each in turn. If
+        the regexps cannot be combined (e.g., duplicate group names,
+        numbered backreferences), spaces are tried in turn."""
         self.spaces = {}
         for spacename, spaceconfig in self.config.get("spaces").items():
             self.spaces[spacename] = RudiSpace(spaceconfig)
 
+        self.space_cregexp = None
+        self.space_groups = {}
+        alternatives = []
+        for spacename in self.spaceorder:
+            rudis = self.spaces.get(spacename)
+            regexps = rudis.config.get("regexps", []) if rudis != None else []
+            if any(re.search(r"\\[0-9]", x) for x in regexps):
+                # numbered backreferences would be off in the alternation
+                alternatives = []
+                break
+            if regexps:
+                group = f"_space{len(self.space_groups)}"
+                self.space_groups[group] = spacename
+                alternatives.append(f"(?P<{group}>{'|'.join(f'(?:{x})' for x in regexps)})")
+
+        if alternatives:
+            try:
+                self.space_cregexp = re.compile("|".join(alternatives))
+            except re.error as e:
+                logger.debug(f"EXCEPTION ({e})")
+
     def setup_ssl(self):
         """Set up SSL for server socket.
 
@@ -776,16 +1263,75 @@ class RudiServer(ThreadingHTTPServer):
             logger.debug(f"EXCEPTION ({e})")
             raise
 
+    def setup_threads(self):
+        """Set up request threads.
+
+        By default, each connection is handled by a new thread. With
+        `http-threads`, connections are handled by a pool of that many
+        threads (and queue up when all are busy)."""
+        nthreads = self.config.get("http-threads")
+        if nthreads:
+            # only imported when used
+            from concurrent.futures import ThreadPoolExecutor
+
+            self.thread_pool = ThreadPoolExecutor(
+                max_workers=nthreads, thread_name_prefix="rudiweb-http"
+            )
+        else:
+            self.thread_pool = None
+
+        # requests (sockets) submitted to the pool, until handled
+        self.pool_requests = set()
+        self.pool_requests_lock = threading.Lock()
+
+    def stat(self, path):
+        """Return `os.stat()` result for path (`None` on error).
+
+        Results are reused for `stat-cache-ttl` seconds (0 disables),
+        so that busy files are not checked for each request."""
+        ttl = self.stat_cache_ttl
+        if ttl <= 0:
+            try:
+                return os.stat(path)
+            except:
+                return None
+
+        now = time.monotonic()
+        cached = self.stat_cache.get(path)
+        if cached != None and cached[0] > now:
+            return cached[1]
+
+        try:
+            st = os.stat(path)
+        except:
+            st = None
+
+        if len(self.stat_cache) >= DOCPATH_CACHE_SIZE:
+            self.stat_cache.clear()
+        self.stat_cache[path] = (now + ttl, st)
+        return st
+
     def upgrade_index_file(self, docpath):
         # return upgrade to index file, if appropriate
-        if docpath.endswith("/"):
-            for index_file in self.index_files:
-                _docpath = f"{docpath}{index_file}"
-                path = server.resolve_docpath(_docpath)
-                if os.path.exists(path):
-                    docpath = _docpath
-                    break
-        return docpath
+        if not docpath.endswith("/"):
+            return docpath
+
+        now = time.monotonic()
+        cached = self.index_file_cache.get(docpath)
+        if cached != None and cached[0] > now:
+            return cached[1]
+
+        upgraded = docpath
+        for index_file in self.index_files:
+            _docpath = f"{docpath}{index_file}"
+            if self.stat(self.resolve_docpath(_docpath)) != None:
+                upgraded = _docpath
+                break
+
+        if len(self.index_file_cache) >= DOCPATH_CACHE_SIZE:
+            self.index_file_cache.clear()
+        self.index_file_cache[docpath] = (now + INDEX_FILE_CACHE_TTL, upgraded)
+        return upgraded
 
 
 class RudiSpace:
@@ -804,33 +1350,40 @@ class RudiSpace:
         self.setup_transformers()
 
     def get_transformers(self, ext, extonly=False):
-        """Return transformers according to ext. By default, also
-        include those registered for "pre" and "post".
+        """Return transformers (tuple) according to ext. By default,
+        also include those registered for "pre" and "post".
+
+        Chains are built once, in `setup_transformers()`.
         """
-        # get a *copy* so it can be updated below!
-        transformers = self.ext2transformers.get(ext, [])[:]
-        if not extonly:
-            pre = self.ext2transformers.get("pre")
-            post = self.ext2transformers.get("post")
-            if pre:
-                transformers = pre + transformers
-            if post:
-                transformers.extend(post)
-
-        return transformers
+        if extonly:
+            return tuple(self.ext2transformers.get(ext, ()))
+        return self.ext2chain.get(ext, self.default_chain)
 
     def get_transformer_extensions(self):
         return list(self.ext2transformers.keys())
 
+    def is_decorated_cacheable(self, ext):
+        """Return if decorated content for ext may be cached or not.
+
+        Requires `decorated-cache` for the space and a chain of only
+        pure transformers (see `PURE_TRANSFORMERS`)."""
+        return self.ext2cacheable.get(ext, self.default_cacheable)
+
     def is_match(self, docpath):
         for cregexp in self.cregexps:
             m = cregexp.match(docpath)
             if m:
                 return m
 
+    def is_pure_chain(self, chain):
+        """Return if all transformers of chain are pure or not."""
+        return all(transformer.absfname in PURE_TRANSFORMERS for transformer in chain)
+
     def setup_extensions(self):
-        # TODO: extensions by space?
-        EXT_TO_CONTENTTYPE.update(self.config.get("extensions", {}))
+        """Set up extension to content type mapping: standard
+        support plus extensions for this space."""
+        self.ext2contenttype = dict(EXT_TO_CONTENTTYPE)
+        self.ext2contenttype.update(self.config.get("extensions", {}))
 
     def setup_regexps(self):
         for regexp in self.config.get("regexps", []):
@@ -851,6 +1404,21 @@ class RudiSpace:
                     l.append(RudiTransformer(absfname, args, kwargs))
                 self.ext2transformers[ext] = l
 
+            # full chains: pre + ext + post
+            pre = tuple(self.ext2transformers.get("pre", ()))
+            post = tuple(self.ext2transformers.get("post", ()))
+            self.default_chain = pre + post
+            self.ext2chain = {
+                ext: pre + tuple(l) + post for ext, l in self.ext2transformers.items()
+            }
+
+            # decorated content caching (opt-in)
+            enabled = self.config.get("decorated-cache", False) == True
+            self.default_cacheable = enabled and self.is_pure_chain(self.default_chain)
+            self.ext2cacheable = {
+                ext: enabled and self.is_pure_chain(chain) for ext, chain in self.ext2chain.items()
+            }
+
             DECORATABLE_EXTENSIONS.extend(self.get_transformer_extensions())
         except Exception as e:
             raise
@@ -904,7 +1472,8 @@ def setup_logging(topconfig):
     }
     if loghandler == "file":
         if logfilename:
-            kwargs["handlers"] = [logging.FileHandler(logfilename)]
+            # opened on first record
+            kwargs["handlers"] = [logging.FileHandler(logfilename, delay=True)]
     elif loghandler == "stream":
         kwargs["handlers"] = [logging.StreamHandler()]
 
@@ -914,6 +1483,111 @@ def setup_logging(topconfig):
     logger = logging.getLogger(__name__)
 
 
+def clean_docpath(urlpath):
+    """Return docpath for url path: unquoted, absolute, normalized and
+    with any trailing "/" kept."""
+    # always absolute (no cwd lookup)
+    docpath = posixpath.normpath(f"""/{unquote(urlpath).lstrip("/")}""")
+    if urlpath.endswith("/") and docpath != "/":
+        docpath = f"{docpath}/"
+    return docpath
+
+
+def format_headers(headers):
+    """Return encoded header lines for list of (name, value) tuples."""
+    return "".join([f"{name}: {value}\r\n" for name, value in headers]).encode("latin-1", "strict")
+
+
+def sendmsg_all(sock, buffers):
+    """Send all buffers to socket with (scatter/gather) `sendmsg()`,
+    continuing after partial sends."""
+    buffers = [memoryview(buf) for buf in buffers if buf]
+    while buffers:
+        n = sock.sendmsg(buffers)
+        while n:
+            if n >= len(buffers[0]):
+                n -= len(buffers.pop(0))
+            else:
+                buffers[0] = buffers[0][n:]
+                n = 0
+
+
+@functools.lru_cache(maxsize=HTTP_DATE_CACHE_SIZE)
+def format_http_date(timestamp):
+    """Return HTTP-Date string for (integer) timestamp.
+
+    Results are cached: the same (e.g., file modification time) values
+    are typically seen over and over."""
+    return formatdate(timestamp, usegmt=True)
+
+
+@functools.lru_cache(maxsize=HTTP_DATE_CACHE_SIZE)
+def parse_http_date(httpdate):
+    """Return timestamp for HTTP-Date string.
+
+    Results are cached: the same (e.g., `If-Modified-Since`) values
+    are typically seen over and over."""
+    return calendar.timegm(parsedate(httpdate))
+
+
+def load_config(filename, cache=False):
+    """Load YAML configuration file.
+
+    Args:
+        filename (str): Configuration filename.
+        cache (bool): Reuse/save parsed configuration from/to
+            `<filename>.cache.json` (valid while the modification
+            time and size of the configuration file are unchanged).
+
+    Returns:
+        Configuration as loaded.
+    """
+    st = os.stat(filename)
+    key = [st.st_mtime_ns, st.st_size]
+    cachefilename = f"{filename}.cache.json"
+
+    if cache:
+        # only imported when used
+        import json
+        import tempfile
+
+        try:
+            # data only (JSON), never code
+            with open(cachefilename, "rb") as f:
+                cached = json.load(f)
+            if cached.get("key") == key:
+                return cached.get("config")
+        except Exception as e:
+            logger.debug(f"EXCEPTION ({e})")
+
+    # binary: let the (C) loader decode
+    with open(filename, "rb") as f:
+        d = yaml.load(f, Loader=SafeLoader)
+
+    if cache:
+        try:
+            # only if JSON represents it exactly (e.g., not for non-str
+            # keys, dates)
+            s = json.dumps({"key": key, "config": d})
+            if json.loads(s)["config"] == d:
+                # replace atomically, from an unpredictable temp file
+                fd, tmpfilename = tempfile.mkstemp(
+                    prefix=f"{os.path.basename(cachefilename)}.",
+                    dir=os.path.dirname(cachefilename) or ".",
+                )
+                try:
+                    with open(fd, "w", encoding="utf-8") as f:
+                        f.write(s)
+                    os.replace(tmpfilename, cachefilename)
+                except:
+                    os.unlink(tmpfilename)
+                    raise
+        except Exception as e:
+            logger.debug(f"EXCEPTION ({e})")
+
+    return d
+
+
 def print_usage():
     progname = os.path.basename(sys.argv[0])
     print(
@@ -922,6 +1596,7 @@ usage: {progname} [<args>] <configfile>
        {progname} -h|--help
 
 Arguments:
+--cache-config  Cache parsed configuration file (as <configfile>.cache.json).
 --create-ephemeral-account
                 Create a one-time ephemeral account and password.
 --document-root Path of "document" tree.
@@ -939,11 +1614,28 @@ class ArgOpts:
     pass
 
 
+# argument (attribute) overrides of configuration settings
+ARGOPTS_OVERRIDES = (
+    ("create_ephemeral_account", "create-ephemeral-account"),
+    ("document_root", "document-root"),
+    ("require_authorization", "require-authorization"),
+    ("rudi_root", "rudi-root"),
+    ("site_root", "site-root"),
+)
+
+# defaults for unset (missing or null) configuration settings
+CONFIG_DEFAULTS = (
+    ("host", "localhost"),
+    ("port", 8090),
+)
+
+
 def main():
     global logger, server
 
     try:
         argopts = ArgOpts()
+        argopts.cache_config = False
         argopts.config_filename = None
         argopts.create_ephemeral_account = None
         argopts.document_root = None
@@ -959,6 +1651,8 @@ def main():
             if arg in ["-h", "--help"]:
                 print_usage()
                 sys.exit(0)
+            elif arg == "--cache-config":
+                argopts.cache_config = True
             elif arg == "--create-ephemeral-account":
                 argopts.create_ephemeral_account = True
             elif arg == "--document-root" and args:
@@ -972,51 +1666,50 @@ def main():
             elif not args:
                 argopts.config_filename = arg
 
+        if argopts.config_filename == None:
+            raise Exception("bad/missing configuration file")
         try:
-            if argopts.config_filename == None:
-                raise Exception()
             config = RudiConfig()
-            config.update(yaml.safe_load(open(argopts.config_filename)))
-
-        except Exception as e:
+            config.update(load_config(argopts.config_filename, argopts.cache_config))
+        except (OSError, TypeError, ValueError, yaml.YAMLError) as e:
+            # unreadable, unparsable, or not a mapping
+            logger.debug(f"EXCEPTION ({e})")
             raise Exception("bad/missing configuration file")
 
         # argument overrides
-        if argopts.create_ephemeral_account != None:
-            config["create-ephemeral-account"] = argopts.create_ephemeral_account
-        if argopts.document_root != None:
-            config["document-root"] = argopts.document_root
-        if argopts.require_authorization != None:
-            config["require-authorization"] = argopts.require_authorization
-        if argopts.rudi_root != None:
-            config["rudi-root"] = argopts.rudi_root
-        if argopts.site_root != None:
-            config["site-root"] = argopts.site_root
+        for attrname, name in ARGOPTS_OVERRIDES:
+            value = getattr(argopts, attrname)
+            if value != None:
+                config[name] = value
 
         # default overrides
-        if config.get("host") == None:
-            config["host"] = "localhost"
-        if config.get("port") == None:
-            config["port"] = 8090
+        for name, value in CONFIG_DEFAULTS:
+            if config.get(name) == None:
+                config[name] = value
 
         # validate
-        if config.get("site-root") == None:
+        site_root = config.get("site-root")
+        if site_root == None:
             raise Exception("site-root not set")
-        if not config.get("site-root").startswith("/"):
+        if not site_root.startswith("/"):
             path = os.path.dirname(os.path.abspath(argopts.config_filename))
-            path = f"{path}/{config['site-root']}"
-            config["site-root"] = path
-        if not os.path.isdir(config["site-root"]):
+            site_root = f"{path}/{site_root}"
+        # normalized (absolute) once; defaults below derive from it
+        site_root = config["site-root"] = os.path.normpath(site_root)
+        if not os.path.isdir(site_root):
             raise Exception("site-root does not exist")
         if config.get("document-root") == None:
-            config["document-root"] = f"{config['site-root']}/html"
+            config["document-root"] = os.path.join(site_root, "html")
         if config.get("rudi-root") == None:
-            config["rudi-root"] = f"{config['site-root']}/rudi"
-
-        # tweak
-        config["site-root"] = os.path.abspath(config.get("site-root"))
-        config["document-root"] = os.path.abspath(config.get("document-root"))
-        config["rudi-root"] = os.path.abspath(config.get("rudi-root"))
+            config["rudi-root"] = os.path.join(site_root, "rudi")
+        nthreads = config.get("http-threads")
+        if nthreads != None and (nthreads.__class__ is not int or nthreads < 1):
+            raise Exception("http-threads must be a positive integer")
+
+        # tweak (normalize; relative to current directory, fetched once)
+        cwd = os.getcwd()
+        for name in ["document-root", "rudi-root"]:
+            config[name] = os.path.normpath(os.path.join(cwd, config[name]))
     except SystemExit:
         raise
     except Exception as e:
@@ -1035,7 +1728,7 @@ def main():
     setup_logging(config)
 
     # update sys.path
-    sys.path.insert(0, f"""{config["site-root"]}/lib""")
+    sys.path.insert(0, f"{config['site-root']}/lib")
 
     # start server
     server = RudiServer(
@@ -1049,7 +1742,11 @@ def main():
     except KeyboardInterrupt:
         pass
     except Exception as e:
-        pass
+        traceback.print_exc()
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        server.server_close()
 
     print(f"exiting ...")
 